@@ -0,0 +1,50 @@
+# images the windows use, decoded once per process and shared by every screen
+import os
+
+from PyQt5.QtGui import QIcon, QPixmap
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> files to try, compact formats first
+FILES = {
+    'menu': ('menu.jpg',),
+    'easy': ('easy.png', 'easy.bmp'),  # easy.png is the same picture as the old 1.4 MB bitmap
+    'back': ('back_icon.jpg',),
+}
+
+try:
+    # the same images compiled into python: pyrcc5 assets.qrc -o assets_rc.py
+    import assets_rc  # noqa: F401
+    RESOURCES = True
+except ImportError:
+    RESOURCES = False
+
+_pixmaps = {}
+_icons = {}
+
+
+def path(name):
+    if RESOURCES:
+        return ':/' + FILES[name][0]
+    for filename in FILES[name]:
+        full = os.path.join(ASSET_DIR, filename)
+        if os.path.exists(full):
+            return full
+    raise FileNotFoundError(f"No image found for '{name}', looked for: " + ", ".join(FILES[name]))
+
+
+def pixmap(name):
+    if name not in _pixmaps:
+        _pixmaps[name] = QPixmap(path(name))
+    return _pixmaps[name]
+
+
+def icon(name):
+    if name not in _icons:
+        _icons[name] = QIcon(pixmap(name))
+    return _icons[name]
+
+
+def preload():  # decode everything up front (needs a QApplication), so no screen waits on the disk
+    for name in FILES:
+        icon(name)
@@ -0,0 +1,400 @@
+# engine benchmarks, no window needed
+#
+#   python bench.py                      run everything, write bench_results.json
+#   python bench.py --quick              smaller corpus, for a fast check
+#   python bench.py --compare old.json   show the change against an earlier run
+#   python bench.py --gui                also time moving between the screens (needs PyQt5)
+#   python bench.py --startup            also check the import time of play.py's modes
+#   python bench.py --batch              also time engine.batch against one board at a time (needs numpy)
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from engine import Bitboard, Board, Engine, Search, SearchMove
+from engine import base3
+from engine.bitboard import FULL, WIN_LINE
+from timing import percentile
+
+FRAME_MS = 1000 / 60  # one frame at 60 Hz
+
+# what each way of starting imports, and the most ms those imports may take (python -X importtime)
+STARTUP = {
+    'cli': ('import play, engine', 50.0),  # --cli and --engine, must not touch Qt
+    'gui': ('import play, game', 400.0),
+}
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+try:
+    import resource  # not on windows
+except ImportError:
+    resource = None
+
+
+def reachable():
+    # every position of a game X started that isn't over yet, with the mark to move
+    positions = []
+    seen = base3.byteTable()  # 1 once the position (by base 3 index) was visited
+    stack = [(0, 0, 0)]
+    while stack:
+        x, o, i = stack.pop()
+        if seen[i]:
+            continue
+        seen[i] = 1
+        if WIN_LINE[x] >= 0 or WIN_LINE[o] >= 0 or x | o == FULL:
+            continue
+        xToMove = bin(x).count('1') == bin(o).count('1')
+        mark = 'X' if xToMove else 'O'
+        positions.append((x, o, mark))
+        for cell in range(9):
+            if not (x | o) >> cell & 1:
+                child = base3.play(i, cell, mark)  # one digit changes, no need to recompute it
+                stack.append((x | 1 << cell, o, child) if xToMove else (x, o | 1 << cell, child))
+    positions.sort()
+    return positions
+
+
+def openings(positions):  # the first two moves of a game, the most expensive to search
+    return [p for p in positions if bin(p[0] | p[1]).count('1') <= 2]
+
+
+def gridOpenings(size, k, count):
+    # a few short random openings on a bigger board
+    rand = random.Random(size * 100 + k)
+    positions = []
+    for _ in range(count):
+        board = Board(size, k)
+        mark = 'X'
+        center = size // 2
+        for _ in range(rand.randint(0, 4)):
+            cell = (center + rand.randint(-2, 2)) * size + center + rand.randint(-2, 2)
+            if board[cell] == ' ':
+                board.play(cell, mark)
+                mark = 'O' if mark == 'X' else 'X'
+        positions.append((board, mark))
+    return positions
+
+
+def processPeakKb():
+    # the process's peak RSS so far: it only ever grows, so a row shows the most any row
+    # up to it needed, not what its own level used
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS, kB elsewhere
+
+
+def run(name, positions, move):
+    # move(position) -> nodes searched, timed one position at a time
+    latencies = []
+    nodes = 0
+    start = time.perf_counter()
+    for position in positions:
+        t = time.perf_counter()
+        nodes += move(position)
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    result = {
+        'positions': len(positions),
+        'seconds': round(total, 6),
+        'nodes': nodes,
+        'nodesPerSec': round(nodes / total) if total else 0,
+        'p50Ms': round(percentile(latencies, 50) * 1000, 4),
+        'p99Ms': round(percentile(latencies, 99) * 1000, 4),
+        'maxMs': round(max(latencies) * 1000, 4) if latencies else 0.0,
+        'processPeakKb': processPeakKb(),
+    }
+    print(f"{name:<22} {result['positions']:>6} pos  {result['nodes']:>9} nodes  "
+          f"{result['nodesPerSec']:>9} n/s  p50 {result['p50Ms']:>8.3f} ms  p99 {result['p99Ms']:>8.3f} ms")
+    return result
+
+
+def levelMove(engine, level):
+    def move(position):
+        x, o, mark = position
+        engine.nodes = 0
+        engine.computerMove(Bitboard(x, o), level, mark)
+        return engine.nodes
+    return move
+
+
+def searchMove(shared):
+    search = Search()
+
+    def move(position):
+        x, o, mark = position
+        s = search if shared else Search()
+        s.bestMove(Bitboard(x, o), mark, 9)
+        return s.nodes
+    return move
+
+
+def thinkMove(budget):
+    def move(position):
+        x, o, mark = position
+        engine = Engine(levels={'think': SearchMove(9)})  # cold, nothing cached from the last move
+        engine.computerMove(Bitboard(x, o), 'think', mark, budget)
+        return engine.nodes
+    return move
+
+
+def gridMove(engine, level):
+    def move(position):
+        board, mark = position
+        engine.nodes = 0
+        engine.computerMove(board, level, mark)
+        return engine.nodes
+    return move
+
+
+def benchmarks(quick):
+    random.seed(0)
+    positions = reachable()
+    opening = openings(positions)
+    if quick:
+        positions = positions[::10]
+    print(f"{len(positions)} positions, {len(opening)} openings")
+    print("processPeakKb in the results is the peak of the whole run so far, not of each row\n")
+
+    results = {}
+    for level in ('easy', 'medium', 'hard'):
+        results[f"3x3/{level}"] = run(f"3x3/{level}", positions, levelMove(Engine(), level))
+    results['3x3/search-warm'] = run('3x3/search-warm', positions, searchMove(shared=True))
+    results['3x3/search-cold'] = run('3x3/search-cold', positions, searchMove(shared=False))
+    results['3x3/openings-cold'] = run('3x3/openings-cold', opening, searchMove(shared=False))
+    for budget in (0.001, 0.005):
+        name = f"3x3/think-{budget * 1000:g}ms"
+        results[name] = run(name, opening, thinkMove(budget))
+
+    for size, k in ((7, 4), (15, 5)):
+        grid = gridOpenings(size, k, 3 if quick else 10)
+        for level in ('medium', 'hard'):
+            name = f"{size}x{size}k{k}/{level}"
+            results[name] = run(name, grid, gridMove(Engine(), level))
+    return results
+
+
+def guiBenchmarks(quick):
+    # menu -> levels -> game and back again, on a window that is never drawn on screen
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets  # only this benchmark needs Qt
+    import assets
+    import game
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    assets.preload()
+    window = QtWidgets.QMainWindow()
+    ui = game.Ui_MainWindow()
+    ui.startup(window)
+    window.show()
+    app.processEvents()
+
+    def play():
+        ui.level = 'easy'
+        ui.setupUi(window, False)
+
+    screens = [('levels', lambda: ui.computerlevel(window)), ('game', play), ('menu', lambda: ui.startup(window))]
+    rounds = 20 if quick else 200
+    latencies = {name: [] for name, _ in screens}
+    tracemalloc.start()
+    for _ in range(rounds):
+        for name, show in screens:
+            t = time.perf_counter()
+            show()
+            app.processEvents()
+            latencies[name].append(time.perf_counter() - t)
+    grown, _ = tracemalloc.get_traced_memory()  # python objects still alive after all the rounds
+    tracemalloc.stop()
+
+    results = {}
+    for name, _ in screens:
+        values = latencies[name]
+        result = {
+            'navigations': len(values),
+            'p50Ms': round(percentile(values, 50) * 1000, 4),
+            'p99Ms': round(percentile(values, 99) * 1000, 4),
+            'maxMs': round(max(values) * 1000, 4),
+            'widgets': len(app.allWidgets()),  # keeps growing if screens are rebuilt
+            'retainedKb': grown // 1024,
+            'processPeakKb': processPeakKb(),
+        }
+        results[f"gui/{name}"] = result
+        print(f"{'gui/' + name:<22} {result['navigations']:>6} nav  {result['widgets']:>6} widgets  "
+              f"p50 {result['p50Ms']:>8.3f} ms  p99 {result['p99Ms']:>8.3f} ms")
+
+    # building the biggest board has to fit in one frame
+    from boardwidget import BoardWidget
+    for size in (3, 15):
+        values = []
+        for _ in range(5 if quick else 50):
+            t = time.perf_counter()
+            board = BoardWidget(None, size)
+            board.resize(310, 290)
+            board.gridLayout.activate()  # lay the cells out now instead of at the first paint
+            values.append(time.perf_counter() - t)
+            board.deleteLater()
+        app.processEvents()
+        result = {
+            'builds': len(values),
+            'p50Ms': round(percentile(values, 50) * 1000, 4),
+            'p99Ms': round(percentile(values, 99) * 1000, 4),
+            'maxMs': round(max(values) * 1000, 4),
+            'frameMs': round(FRAME_MS, 3),
+        }
+        results[f"gui/board{size}"] = result
+        print(f"{f'gui/board{size}':<22} {result['builds']:>6} builds  p50 {result['p50Ms']:>8.3f} ms  "
+              f"p99 {result['p99Ms']:>8.3f} ms  {'ok' if result['p99Ms'] < FRAME_MS else 'over a frame'}")
+    return results
+
+
+def batchBenchmarks(quick):
+    # every 3 x 3 board (even the impossible ones) classified one at a time, then all at once
+    try:
+        import numpy as np
+    except ImportError:
+        print(f"{'batch/3x3':<22} skipped, numpy isn't installed")
+        return {}
+    from engine import batch
+
+    pairs = [(x, o) for x in range(FULL + 1) for o in range(FULL + 1) if not x & o]
+    repeat = 10 if quick else 100
+    boards = np.tile(batch.fromBits([x for x, _ in pairs], [o for _, o in pairs]), (repeat, 1))
+    bits = [Bitboard(x, o) for x, o in pairs] * repeat
+    codes = {'': batch.ONGOING, 'X': batch.X_WINS, 'O': batch.O_WINS, 'Tie': batch.TIE}
+
+    t = time.perf_counter()
+    loop = [(codes[b.result()], b.winningLine()[1], b.empty()) for b in bits]
+    loopSeconds = time.perf_counter() - t
+
+    t = time.perf_counter()
+    result, line = batch.classify(boards)
+    legal = batch.legalMoves(boards, result=result)
+    batchSeconds = time.perf_counter() - t
+
+    same = all(r == result[i] and l == line[i] for i, (r, l, _) in enumerate(loop[:len(pairs)]))
+    same = same and all(legal[i].any() == bool(loop[i][2] and not loop[i][0]) for i in range(len(pairs)))
+    results = {
+        'boards': len(bits),
+        'loopMs': round(loopSeconds * 1000, 3),
+        'batchMs': round(batchSeconds * 1000, 3),
+        'loopPerSec': round(len(bits) / loopSeconds),
+        'batchPerSec': round(len(bits) / batchSeconds),
+        'speedup': round(loopSeconds / batchSeconds, 2),
+        'same': same,
+    }
+    print(f"{'batch/3x3':<22} {results['boards']:>8} boards  loop {results['loopMs']:>9.1f} ms  "
+          f"batch {results['batchMs']:>8.1f} ms  {results['speedup']:>6.1f}x  {'same' if same else 'DIFFERENT'}")
+    return {'batch/3x3': results}
+
+
+def importTime(code):
+    # (ms, modules) of the imports code does in a fresh interpreter, the interpreter's own not counted
+    run = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=HERE,
+                         capture_output=True, text=True, check=True)
+    total = 0
+    modules = []
+    for line in run.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append(name.strip())
+        if name[1:] == name.strip():  # top level, the nested imports are already counted in it
+            total += int(cumulative)
+    return total / 1000, modules
+
+
+def startupBenchmarks(quick):
+    base = min(importTime('pass')[0] for _ in range(3))
+    results = {}
+    for name, (code, target) in STARTUP.items():
+        try:
+            runs = [importTime(code) for _ in range(3 if quick else 10)]
+        except subprocess.CalledProcessError as e:
+            print(f"{'startup/' + name:<22} skipped, {e.stderr.strip().splitlines()[-1]}")
+            continue
+        ms = round(min(t for t, _ in runs) - base, 3)
+        qt = any(module.startswith('PyQt5') for module in runs[0][1])
+        result = {'importMs': ms, 'targetMs': target, 'qt': qt}
+        if name == 'cli':
+            # the whole process, from starting python to answering one position
+            t = time.perf_counter()
+            subprocess.run([sys.executable, 'play.py', '--engine'], cwd=HERE, input='X........ hard\n',
+                           capture_output=True, text=True, check=True)
+            result['processMs'] = round((time.perf_counter() - t) * 1000, 3)
+        ok = ms <= target and not (name == 'cli' and qt)
+        results[f"startup/{name}"] = result
+        print(f"{'startup/' + name:<22} imports {ms:>8.3f} ms  target {target:>6.1f} ms  "
+              f"{'with Qt' if qt else 'no Qt':<8} {'ok' if ok else 'FAILED'}")
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    print(f"\n{'':<22} {'p50 ms':>20} {'p99 ms':>20} {'nodes/s':>22}")
+    for name, now in new.items():
+        before = old.get(name)
+        if before is None:
+            continue
+
+        def change(key):
+            if key not in before or key not in now:
+                return f"{'-':>27}"
+            a, b = before[key], now[key]
+            ratio = f"{b / a:.2f}x" if a else "-"
+            return f"{a:>8} -> {b:<8} {ratio:>6}"
+        print(f"{name:<22} {change('p50Ms')} {change('p99Ms')} {change('nodesPerSec')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tic tac toe engine")
+    parser.add_argument('--out', default='bench_results.json', help="where to write the JSON results")
+    parser.add_argument('--compare', help="earlier JSON results to compare with")
+    parser.add_argument('--quick', action='store_true', help="every 10th position only")
+    parser.add_argument('--gui', action='store_true', help="also time moving between the screens")
+    parser.add_argument('--startup', action='store_true', help="also check how fast play.py starts")
+    parser.add_argument('--batch', action='store_true', help="also time the numpy batch classifier")
+    args = parser.parse_args()
+
+    results = benchmarks(args.quick)
+    if args.gui:
+        print()
+        results.update(guiBenchmarks(args.quick))
+    if args.startup:
+        print()
+        results.update(startupBenchmarks(args.quick))
+    if args.batch:
+        print()
+        results.update(batchBenchmarks(args.quick))
+    report = {
+        'commit': commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': args.quick,
+        'gui': args.gui,
+        'startup': args.startup,
+        'batch': args.batch,
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f)['results'], results)
+
+
+if __name__ == "__main__":
+    main()
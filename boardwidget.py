@@ -0,0 +1,39 @@
+# the grid of cell buttons, built from the board size instead of one block per button
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+SIDE = 300  # px the cells and the gaps between them take, whatever the size
+
+
+class BoardWidget(QtWidgets.QWidget):
+    clicked = QtCore.pyqtSignal(int)  # cell that was clicked, numbered from 1 like pB1..pB9
+
+    def __init__(self, parent=None, size=3):
+        super().__init__(parent)
+        self.size = size
+        self.setObjectName("gridLayoutWidget")
+
+        self.gridLayout = QtWidgets.QGridLayout(self)
+        self.gridLayout.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout.setSpacing(max(2, 30 // size))  # 10 on the 3 x 3 board
+        self.gridLayout.setObjectName("gridLayout")
+
+        # 93 px cells with 30 pt marks on the 3 x 3 board, smaller ones on bigger boards
+        spacing = self.gridLayout.spacing()
+        cell = (SIDE - spacing * (size - 1)) // size
+        font = QtGui.QFont()  # one font for every cell
+        font.setPointSize(max(1, cell * 30 // 93))
+
+        # one group sends every click, with the cell number as the button's id
+        self.group = QtWidgets.QButtonGroup(self)
+        self.group.setExclusive(False)
+        self.group.buttonClicked[int].connect(self.clicked)
+
+        self.buttons = []
+        for i in range(size * size):
+            button = QtWidgets.QPushButton(self)
+            button.setMinimumSize(QtCore.QSize(cell, cell))
+            button.setFont(font)
+            button.setObjectName(f"pB{i + 1}")
+            self.gridLayout.addWidget(button, i // size, i % size, 1, 1)
+            self.group.addButton(button, i + 1)
+            self.buttons.append(button)
@@ -0,0 +1,12 @@
+# Game logic shared by the tic tac toe windows (game.py, lastihope.py, "not last.py")
+# nothing in here imports PyQt5, so it can run without a display
+
+from engine.bitboard import Bitboard, LINES, WIN_MASKS
+from engine.board import Board
+from engine.deepening import DeepeningSearch
+from engine.engine import Engine
+from engine.levels import GRID_LEVELS, LEVELS, DeepeningMove, Level, PerfectMove, RandomMove, SearchMove, WorstMove
+from engine.search import Search
+from engine.state import GameState
+from engine.tablebase import Tablebase
+from engine.transposition import TranspositionTable, positionKey
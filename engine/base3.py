@@ -0,0 +1,57 @@
+# dense index of a 3 x 3 position: one base 3 digit per cell, 0 empty, 1 X, 2 O
+# (or 1 me, 2 opp), so every position is a number in [0, 3 ** 9) and a per position
+# table is a flat array instead of a dict
+#
+# an index follows the moves without being recomputed: play adds digit * 3 ** cell,
+# undo takes it away again
+from array import array
+
+from engine.bitboard import CELLS, FULL
+
+SLOTS = 3 ** 9
+POW3 = tuple(3 ** i for i in range(9))
+DIGIT = {'X': 1, 'O': 2}
+
+# BASE3[bits] = sum of 3**i over the cells in bits
+BASE3 = tuple(sum(POW3[i] for i in CELLS[bits]) for bits in range(FULL + 1))
+
+_unpacked = None  # (x, o) arrays for fromIndex, built the first time it's used
+
+
+def index(x, o):
+    return BASE3[x] + 2 * BASE3[o]
+
+
+def fromIndex(i):  # (x, o) bit masks of the position
+    global _unpacked
+    if _unpacked is None:
+        # cells 1-8 of j are the position j // 3, one cell further along
+        x = array('H', [0]) * SLOTS
+        o = array('H', [0]) * SLOTS
+        for j in range(1, SLOTS):
+            rest = j // 3
+            d = j - 3 * rest
+            x[j] = x[rest] << 1 | (d == 1)
+            o[j] = o[rest] << 1 | (d == 2)
+        _unpacked = (x, o)
+    return _unpacked[0][i], _unpacked[1][i]
+
+
+def play(i, cell, mark):
+    return i + DIGIT[mark] * POW3[cell]
+
+
+def undo(i, cell, mark):
+    return i - DIGIT[mark] * POW3[cell]
+
+
+def digit(i, cell):  # 0 empty, 1 X, 2 O
+    return i // POW3[cell] % 3
+
+
+def table(typecode='H', fill=0):  # one slot per position, see the array module for typecodes
+    return array(typecode, [fill]) * SLOTS
+
+
+def byteTable(fill=0):
+    return bytearray([fill]) * SLOTS
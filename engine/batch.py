@@ -0,0 +1,103 @@
+# classifies many boards at once with numpy, for self-play stats, tablebase checks and tests
+# boards are (N, cells) int8 arrays, one row per board, cells by row: 0 empty, 1 X, 2 O
+#
+# numpy is optional: only this module uses it, and engine/__init__ doesn't import it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from engine.bitboard import FULL, LINES, WIN_LINE
+from engine.board import geometry
+
+EMPTY, X, O = 0, 1, 2
+
+# what classify says about each board, same order as '', 'X', 'O', 'Tie' from result()
+ONGOING, X_WINS, O_WINS, TIE = 0, 1, 2, 3
+
+ELEMENTS = 1 << 22  # cells per temporary in a pass, the boards per pass follow from the shape
+
+_lines = {}  # (size, k) -> (lines, k) array of cells
+_small = None  # (cell weights, WIN_LINE) arrays for the 3 x 3 board
+
+
+def _needNumpy():
+    if np is None:
+        raise ImportError("engine.batch needs numpy, run: pip install numpy")
+
+
+def lineTable(size, k):
+    # cells of every winning line, numbered like Bitboard / Board number their lines
+    key = (size, k)
+    if key not in _lines:
+        _lines[key] = np.array(LINES if key == (3, 3) else geometry(size, k).lines, dtype=np.intp)
+    return _lines[key]
+
+
+def _boards(boards, k):  # (boards as an int8 array, size, k)
+    boards = np.asarray(boards, dtype=np.int8)
+    size = int(round(boards.shape[-1] ** 0.5)) if boards.ndim == 2 else 0
+    if size * size != boards.shape[-1] or boards.ndim != 2:
+        raise ValueError("Boards must be an (N, size * size) array.")
+    return boards, size, k or min(size, 5)
+
+
+def _classifySmall(chunk):
+    # 3 x 3: each side's cells become a 9 bit mask, and WIN_LINE already checked every
+    # mask against the 8 lines, so a lookup does it
+    global _small
+    if _small is None:
+        _small = ((1 << np.arange(9)).astype(np.int16), np.array(WIN_LINE, dtype=np.int16))
+    weights, winLine = _small
+    x = (chunk == X).astype(np.int16) @ weights
+    o = (chunk == O).astype(np.int16) @ weights
+    xLine = winLine[x]
+    oLine = winLine[o]
+    result = np.select([xLine >= 0, oLine >= 0, (x | o) == FULL], [X_WINS, O_WINS, TIE], ONGOING)
+    return result, np.where(xLine >= 0, xLine, oLine)
+
+
+def classify(boards, k=None):
+    # (result, line) for every board: ONGOING, X_WINS, O_WINS or TIE, and the index of
+    # the winning line (-1 if there is none); X is checked first, like winningLine()
+    _needNumpy()
+    boards, size, k = _boards(boards, k)
+    table = lineTable(size, k)
+    result = np.empty(len(boards), dtype=np.int8)
+    line = np.empty(len(boards), dtype=np.int16)
+    # the big temporaries are (boards, lines, k) cells, (boards, cells) on 3 x 3
+    chunkSize = max(1, ELEMENTS // (size * size if (size, k) == (3, 3) else len(table) * k))
+    for start in range(0, len(boards), chunkSize):
+        chunk = boards[start:start + chunkSize]
+        end = start + len(chunk)
+        if (size, k) == (3, 3):
+            result[start:end], line[start:end] = _classifySmall(chunk)
+            continue
+        cells = chunk[:, table]  # (boards, lines, k)
+        xLines = (cells == X).all(axis=2)
+        oLines = (cells == O).all(axis=2)
+        xWins = xLines.any(axis=1)
+        oWins = oLines.any(axis=1)
+        full = (chunk != EMPTY).all(axis=1)
+        result[start:end] = np.select([xWins, oWins, full], [X_WINS, O_WINS, TIE], ONGOING)
+        line[start:end] = np.where(xWins, xLines.argmax(axis=1), np.where(oWins, oLines.argmax(axis=1), -1))
+    return result, line
+
+
+def legalMoves(boards, k=None, result=None):
+    # (N, cells) bool array of the cells that can be played, none on a finished board
+    _needNumpy()
+    boards, size, k = _boards(boards, k)
+    if result is None:
+        result, _ = classify(boards, k)
+    return (boards == EMPTY) & (result == ONGOING)[:, None]
+
+
+def fromBits(x, o, cells=9):
+    # bit masks of X and O for every board (as in Bitboard / Board) -> (N, cells) int8 boards
+    # the masks have to fit in 63 bits, so boards up to 7 x 7
+    _needNumpy()
+    shifts = np.arange(cells, dtype=np.int64)
+    x = np.asarray(x, dtype=np.int64)[:, None] >> shifts & 1
+    o = np.asarray(o, dtype=np.int64)[:, None] >> shifts & 1
+    return (x * X + o * O).astype(np.int8)
@@ -0,0 +1,101 @@
+# board stored as two 9 bit numbers, bit i is cell i (0 = top left, 8 = bottom right)
+
+FULL = 0x1FF  # all 9 cells taken
+
+# same order checkGameOver always used: rows, columns, then the two diagonals
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6))
+WIN_MASKS = tuple((1 << a) | (1 << b) | (1 << c) for a, b, c in LINES)
+
+# WIN_LINE[bits] is the index of the first line covered by bits, or -1
+# 512 entries so a win test is a single lookup
+WIN_LINE = tuple(next((i for i, mask in enumerate(WIN_MASKS) if bits & mask == mask), -1)
+                 for bits in range(FULL + 1))
+
+# cells of every empty-bits pattern, so move generation doesn't loop over the board
+CELLS = tuple(tuple(i for i in range(9) if bits >> i & 1) for bits in range(FULL + 1))
+
+
+class Bitboard(object):
+    __slots__ = ('x', 'o')
+    size = 3  # same shape attributes as engine.board.Board
+    k = 3
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def fromList(cls, board):
+        bits = cls()
+        for i, cell in enumerate(board):
+            if cell != ' ':
+                bits.play(i, cell)
+        return bits
+
+    def toList(self):
+        return ['X' if self.x >> i & 1 else 'O' if self.o >> i & 1 else ' ' for i in range(9)]
+
+    def copy(self):
+        return Bitboard(self.x, self.o)
+
+    def clear(self):
+        self.x = 0
+        self.o = 0
+
+    def play(self, cell, mark):
+        if mark == 'X':
+            self.x |= 1 << cell
+        else:
+            self.o |= 1 << cell
+
+    def undo(self, cell):
+        self.x &= ~(1 << cell)
+        self.o &= ~(1 << cell)
+
+    def empty(self):
+        return FULL & ~(self.x | self.o)
+
+    def emptyCells(self):
+        return CELLS[FULL & ~(self.x | self.o)]
+
+    def isFull(self):
+        return self.x | self.o == FULL
+
+    def winningLine(self):  # (mark, line index) of a finished line, or ('', -1)
+        line = WIN_LINE[self.x]
+        if line >= 0:
+            return 'X', line
+        line = WIN_LINE[self.o]
+        if line >= 0:
+            return 'O', line
+        return '', -1
+
+    def lineCells(self, line):
+        return LINES[line]
+
+    def result(self):  # 'X', 'O', 'Tie' or '' just like checkGameOver
+        if WIN_LINE[self.x] >= 0:
+            return 'X'
+        if WIN_LINE[self.o] >= 0:
+            return 'O'
+        if self.x | self.o == FULL:
+            return 'Tie'
+        return ''
+
+    def __getitem__(self, cell):
+        if self.x >> cell & 1:
+            return 'X'
+        if self.o >> cell & 1:
+            return 'O'
+        return ' '
+
+    def __eq__(self, other):
+        return isinstance(other, Bitboard) and self.x == other.x and self.o == other.o
+
+    def __hash__(self):
+        return self.x << 9 | self.o
+
+    def __repr__(self):
+        return 'Bitboard(%r)' % ''.join(self.toList())
@@ -0,0 +1,196 @@
+# N x N board (3 to 15) where K marks in a row win, for the bigger gomoku-like games
+# same interface as Bitboard, so GameState and the engine work with either one
+MAX_SIZE = 15
+
+_geometry = {}  # (size, k) -> Geometry, built once per board shape
+
+
+class Geometry(object):
+    # every winning window of a size x size board and the windows through each cell
+    def __init__(self, size, k):
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+
+        lines = []
+        for row in range(size):
+            for col in range(size):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    endRow, endCol = row + dr * (k - 1), col + dc * (k - 1)
+                    if 0 <= endRow < size and 0 <= endCol < size:
+                        lines.append(tuple((row + dr * i) * size + col + dc * i for i in range(k)))
+        self.lines = tuple(lines)
+        self.masks = tuple(sum(1 << cell for cell in line) for line in lines)
+
+        through = [[] for _ in range(self.cells)]
+        for i, line in enumerate(lines):
+            for cell in line:
+                through[cell].append(i)
+        self.through = tuple(tuple(ids) for ids in through)  # line ids through every cell
+
+        # cells next to every cell (8 around it), to only look at moves close to the action
+        neighbours = []
+        for cell in range(self.cells):
+            row, col = divmod(cell, size)
+            neighbours.append(tuple(r * size + c
+                                    for r in range(max(row - 1, 0), min(row + 2, size))
+                                    for c in range(max(col - 1, 0), min(col + 2, size))
+                                    if (r, c) != (row, col)))
+        self.neighbours = tuple(neighbours)
+
+
+def geometry(size, k):
+    key = (size, k)
+    if key not in _geometry:
+        if not 3 <= size <= MAX_SIZE:
+            raise ValueError(f"Board size must be between 3 and {MAX_SIZE}.")
+        if not 3 <= k <= size:
+            raise ValueError("Win length must be between 3 and the board size.")
+        _geometry[key] = Geometry(size, k)
+    return _geometry[key]
+
+
+# value of a window nobody blocked, by how many marks are in it
+WEIGHTS = (0,) + tuple(10 ** n for n in range(MAX_SIZE))
+
+
+class Board(object):
+    # make / unmake keep per line mark counters up to date, so a move costs
+    # O(lines through the cell) and nothing ever rescans the whole board
+    def __init__(self, size=3, k=3):
+        self.geometry = geometry(size, k)
+        self.size = size
+        self.k = k
+        self.clear()
+
+    def copy(self):
+        board = Board(self.size, self.k)
+        board.x, board.o = self.x, self.o
+        board.line, board.winner = self.line, self.winner
+        board.xCount = self.xCount[:]
+        board.oCount = self.oCount[:]
+        board.emptyCount = self.emptyCount
+        board.score = self.score
+        board.near = dict(self.near)
+        board.history = self.history[:]
+        return board
+
+    def clear(self):
+        lines = len(self.geometry.lines)
+        self.x = 0
+        self.o = 0
+        self.line = -1  # winning line id once somebody has one
+        self.winner = ''
+        self.xCount = [0] * lines  # X marks in every line
+        self.oCount = [0] * lines
+        self.emptyCount = self.geometry.cells
+        self.score = 0  # sum of open window values, from X's side
+        self.near = {}  # empty or not, cell -> marks around it
+        self.history = []  # cells in the order they were played
+
+    def make(self, cell, mark):  # returns the winner after this move ('' if none)
+        geo = self.geometry
+        if mark == 'X':
+            self.x |= 1 << cell
+            mine, theirs, sign = self.xCount, self.oCount, 1
+        else:
+            self.o |= 1 << cell
+            mine, theirs, sign = self.oCount, self.xCount, -1
+        for i in geo.through[cell]:
+            count = mine[i] + 1
+            mine[i] = count
+            if not theirs[i]:
+                self.score += sign * (WEIGHTS[count] - WEIGHTS[count - 1])
+            elif count == 1:
+                # the window was theirs, now it's blocked and worth nothing
+                self.score += sign * WEIGHTS[theirs[i]]
+            if count == geo.k and not self.winner:
+                self.line = i
+                self.winner = mark
+        self.emptyCount -= 1
+        for around in geo.neighbours[cell]:
+            self.near[around] = self.near.get(around, 0) + 1
+        self.history.append(cell)
+        return self.winner
+
+    def unmake(self):  # take back the last move
+        self.remove(self.history[-1])
+
+    def remove(self, cell):
+        geo = self.geometry
+        if self.x >> cell & 1:
+            self.x &= ~(1 << cell)
+            mine, theirs, sign = self.xCount, self.oCount, 1
+        elif self.o >> cell & 1:
+            self.o &= ~(1 << cell)
+            mine, theirs, sign = self.oCount, self.xCount, -1
+        else:
+            return
+        for i in geo.through[cell]:
+            count = mine[i]
+            mine[i] = count - 1
+            if not theirs[i]:
+                self.score -= sign * (WEIGHTS[count] - WEIGHTS[count - 1])
+            elif count == 1:
+                self.score -= sign * WEIGHTS[theirs[i]]
+        if self.line >= 0 and cell in geo.lines[self.line]:
+            self.line = -1
+            self.winner = ''
+        self.emptyCount += 1
+        for around in geo.neighbours[cell]:
+            if self.near[around] == 1:
+                del self.near[around]
+            else:
+                self.near[around] -= 1
+        if self.history[-1] == cell:
+            self.history.pop()
+        else:
+            self.history.remove(cell)
+
+    # same names as Bitboard
+    def play(self, cell, mark):
+        self.make(cell, mark)
+
+    def undo(self, cell):
+        self.remove(cell)
+
+    def empty(self):
+        return self.geometry.full & ~(self.x | self.o)
+
+    def emptyCells(self):
+        empty = self.empty()
+        return tuple(cell for cell in range(self.geometry.cells) if empty >> cell & 1)
+
+    def nearCells(self):  # empty cells next to at least one mark
+        taken = self.x | self.o
+        return [cell for cell in self.near if not taken >> cell & 1]
+
+    def isFull(self):
+        return not self.emptyCount
+
+    def winningLine(self):  # (mark, line id) of a finished line, or ('', -1)
+        return self.winner, self.line
+
+    def lineCells(self, line):
+        return self.geometry.lines[line]
+
+    def result(self):  # 'X', 'O', 'Tie' or ''
+        if self.winner:
+            return self.winner
+        if not self.emptyCount:
+            return 'Tie'
+        return ''
+
+    def toList(self):
+        return [self[cell] for cell in range(self.geometry.cells)]
+
+    def __getitem__(self, cell):
+        if self.x >> cell & 1:
+            return 'X'
+        if self.o >> cell & 1:
+            return 'O'
+        return ' '
+
+    def __repr__(self):
+        return 'Board(%d, %d, %r)' % (self.size, self.k, ''.join(self.toList()))
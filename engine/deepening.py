@@ -0,0 +1,106 @@
+# iterative deepening alpha-beta for boards too big to search to the end
+# it searches depth 1, 2, 3... until the time budget runs out and plays the
+# best move of the deepest search that finished
+from time import perf_counter
+
+from engine.trace import traced
+
+WIN = 10 ** 18  # more than any board.score can add up to
+
+
+class Timeout(Exception):
+    pass
+
+
+class DeepeningSearch(object):
+    def __init__(self):
+        self.nodes = 0
+        self.depth = 0  # deepest search that finished last time
+        self.bestMoves = {}  # (x, o) -> best move found, tried first next time
+
+    @traced('DeepeningSearch.think', 'search', lambda search: {'nodes': search.nodes, 'depth': search.depth})
+    def think(self, board, mark, budget=0.5, maxDepth=None):
+        # best move for mark within budget seconds, board is left as it was
+        board = board.copy()  # make / unmake on our own copy
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = perf_counter() + budget
+        if maxDepth is None:
+            maxDepth = board.emptyCount
+
+        moves = self.candidates(board, mark)
+        best = moves[0]  # something to play even if depth 1 doesn't finish
+        for depth in range(1, maxDepth + 1):
+            try:
+                score, move = self.root(board, mark, moves, depth)
+            except Timeout:
+                break
+            best = move
+            self.depth = depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN - 1000:  # forced win or loss found, deeper won't change it
+                break
+        self.bestMoves.clear()
+        return best
+
+    def candidates(self, board, mark):
+        # empty cells next to a mark, the ones on more windows still open for us first
+        if not board.history:
+            center = board.size // 2
+            return [center * board.size + center]
+        geo = board.geometry
+        theirs = board.xCount if mark == 'O' else board.oCount
+        moves = board.nearCells()
+        moves.sort(key=lambda cell: -sum(1 for i in geo.through[cell] if not theirs[i]))
+        return moves
+
+    def root(self, board, mark, moves, depth):
+        other = 'X' if mark == 'O' else 'O'
+        alpha = -WIN - 1
+        best = moves[0]
+        for cell in moves:
+            board.make(cell, mark)
+            score = -self.negamax(board, other, depth - 1, -WIN - 1, -alpha, 1)
+            board.unmake()
+            if score > alpha:
+                alpha = score
+                best = cell
+        return alpha, best
+
+    def negamax(self, board, mark, depth, alpha, beta, ply):
+        # score for mark (the side to move), higher is better
+        self.nodes += 1
+        if not self.nodes & 63 and perf_counter() > self.deadline:
+            raise Timeout()
+
+        if board.winner:  # the move that got us here made a line
+            return ply - WIN
+        if not board.emptyCount:
+            return 0
+        if depth <= 0:
+            return board.score if mark == 'X' else -board.score
+
+        moves = self.candidates(board, mark)
+        key = (board.x, board.o)
+        hint = self.bestMoves.get(key)
+        if hint is not None and hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+        other = 'X' if mark == 'O' else 'O'
+        best = -WIN - 1
+        bestMove = moves[0]
+        for cell in moves:
+            board.make(cell, mark)
+            score = -self.negamax(board, other, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake()
+            if score > best:
+                best = score
+                bestMove = cell
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        self.bestMoves[key] = bestMove
+        return best
@@ -0,0 +1,78 @@
+from time import perf_counter
+
+from engine.deepening import DeepeningSearch
+from engine.levels import GRID_LEVELS, LEVELS
+from engine.search import Search
+from engine.tablebase import Tablebase
+from engine.trace import traced
+
+
+def tableCounts(engine):  # transposition table totals before a move
+    return engine.search.table.hits, engine.search.table.misses
+
+
+def searchStats(engine, counts):  # what the trace shows for every move, cache use of that move only
+    table = engine.search.table
+    return {'nodes': engine.nodes, 'depth': engine.depth,
+            'tableHits': table.hits - counts[0], 'tableMisses': table.misses - counts[1]}
+
+
+class Engine(object):
+    # picks the computer's moves, one instance keeps its caches between moves and games
+    def __init__(self, levels=None, tablebase=None, gridLevels=None):
+        self.levels = dict(LEVELS if levels is None else levels)  # for 3 x 3
+        self.gridLevels = dict(GRID_LEVELS if gridLevels is None else gridLevels)  # for bigger boards
+        self.search = Search()
+        self.deepening = DeepeningSearch()
+        self._tablebase = tablebase
+        self.nodes = 0  # positions the last search visited
+        self.depth = 0  # depth the last iterative deepening search finished
+        self.elapsed = 0.0  # seconds the last computerMove took
+        self.values = {}  # (me, opp) -> moveValues, at most 5478 positions on 3 x 3
+
+    @property
+    def tablebase(self):  # only mapped the first time a level needs it
+        if self._tablebase is None:
+            self._tablebase = Tablebase.load()
+        return self._tablebase
+
+    @traced('computerMove', args=searchStats, before=tableCounts)
+    def computerMove(self, bits, level, mark='O', budget=None):
+        # budget: seconds the move may take, for the levels that search (None: the level's own
+        # depth or budget); nodes, depth and elapsed tell what the move cost
+        levels = self.levels if (bits.size, bits.k) == (3, 3) else self.gridLevels
+        strategy = levels.get(level)
+        if strategy is None:
+            raise ValueError("Invalid level. Choose from " + ", ".join(f"'{name}'" for name in levels) + ".")
+        self.nodes = 0
+        self.depth = 0
+        start = perf_counter()
+        move = strategy.move(self, bits, mark, budget)
+        self.elapsed = perf_counter() - start
+        return move
+
+    @traced('analyse')
+    def analyse(self, bits, mark):
+        # {cell: (result, plies)} for every free cell, from mark's side (see Tablebase.moveValues)
+        # any move can change what every other cell is worth, so whole positions are cached,
+        # which makes undo, redo and the usual openings free
+        if (bits.size, bits.k) != (3, 3):
+            raise ValueError("Analysis needs the tablebase, the 3 x 3 board only.")
+        key = (bits.x, bits.o) if mark == 'X' else (bits.o, bits.x)
+        values = self.values.get(key)
+        if values is None:
+            values = self.values[key] = self.tablebase.moveValues(*key)
+        return values
+
+    def searchMove(self, bits, mark, depth):
+        move = self.search.bestMove(bits, mark, depth)
+        self.nodes = self.search.nodes
+        return move
+
+    def thinkMove(self, bits, mark, budget, maxDepth=None):
+        # iterative deepening within budget seconds, the 3 x 3 board gets the exact search
+        search = self.search if (bits.size, bits.k) == (3, 3) else self.deepening
+        move = search.think(bits, mark, budget, maxDepth)
+        self.nodes = search.nodes
+        self.depth = search.depth
+        return move
@@ -0,0 +1,77 @@
+# how the computer picks its move at every difficulty
+# a level gets the engine (for its search and tablebase), the board, the mark it plays
+# and the time budget the move has (None if the caller didn't give one)
+import random
+
+
+def other(mark):
+    return 'X' if mark == 'O' else 'O'
+
+
+class Level(object):
+    # cacheable: the answer follows from the position alone (not from chance or the clock),
+    # so a cache may hand it out again
+    cacheable = False
+
+    def move(self, engine, bits, mark, budget=None):
+        raise NotImplementedError
+
+
+class WorstMove(Level):
+    # looks one move ahead from the opponent's side: takes the cell the opponent
+    # would win on, otherwise the first free one
+    cacheable = True
+
+    def move(self, engine, bits, mark, budget=None):
+        return engine.searchMove(bits, other(mark), depth=1)
+
+
+class RandomMove(Level):
+    def move(self, engine, bits, mark, budget=None):
+        return random.choice(bits.emptyCells())
+
+
+class SearchMove(Level):
+    # alpha-beta search to a fixed depth
+    cacheable = True
+
+    def __init__(self, depth):
+        self.depth = depth
+
+    def move(self, engine, bits, mark, budget=None):
+        if budget is not None:  # as deep as the budget allows, up to the level's depth
+            return engine.thinkMove(bits, mark, budget, self.depth)
+        return engine.searchMove(bits, mark, self.depth)
+
+
+class PerfectMove(Level):
+    # any of the best moves from the tablebase (a lookup, well inside any budget)
+    cacheable = True  # the move picked may change, what it's worth doesn't
+
+    def move(self, engine, bits, mark, budget=None):
+        if mark == 'O':
+            return engine.tablebase.bestMove(bits.o, bits.x)
+        return engine.tablebase.bestMove(bits.x, bits.o)
+
+
+class DeepeningMove(Level):
+    # iterative deepening, deeper until budget seconds are used up (for big boards)
+    def __init__(self, budget):
+        self.budget = budget
+
+    def move(self, engine, bits, mark, budget=None):
+        return engine.thinkMove(bits, mark, self.budget if budget is None else budget)
+
+
+LEVELS = {
+    'easy': WorstMove(),
+    'medium': RandomMove(),
+    'hard': PerfectMove(),
+}
+
+# boards bigger than 3 x 3 can't be solved, they get a time budget instead
+GRID_LEVELS = {
+    'easy': RandomMove(),
+    'medium': DeepeningMove(0.05),
+    'hard': DeepeningMove(0.5),
+}
@@ -0,0 +1,116 @@
+# compact records of finished 3 x 3 games, and the append-only log they are kept in
+#
+# a record is a header byte, moves (low nibble) and 0x10 if O started, then the cells
+# played (0-8) 4 bits each, two to a byte, the earlier move in the low nibble:
+# a full game of 9 moves takes 6 bytes
+#
+# GameLog writes on a thread of its own, so whoever appends (the window) never waits on
+# the disk; readGames streams a log back one game at a time, however big it is
+import os
+import queue
+import threading
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'games.log')
+
+O_STARTS = 0x10
+MAX_MOVES = 9
+CHUNK = 1 << 20  # bytes read at a time by readGames
+
+
+def encode(moves, starter='X'):
+    # cells played, in order -> bytes
+    if len(moves) > MAX_MOVES:
+        raise ValueError(f"a 3 x 3 game has at most {MAX_MOVES} moves")
+    data = bytearray([len(moves) | (O_STARTS if starter == 'O' else 0)])
+    for i in range(0, len(moves), 2):
+        pair = moves[i:i + 2]
+        if not all(0 <= cell < 9 for cell in pair):
+            raise ValueError("cells go from 0 to 8")
+        data.append(pair[0] | (pair[1] << 4 if len(pair) == 2 else 0))
+    return bytes(data)
+
+
+def size(header):  # bytes taken by the record starting with this header byte
+    return 1 + ((header & 0x0F) + 1) // 2
+
+
+def decode(data, start=0):
+    # (moves, starter) of the record at data[start]
+    header = data[start]
+    count = header & 0x0F
+    moves = []
+    for byte in data[start + 1:start + size(header)]:
+        moves.append(byte & 0x0F)
+        moves.append(byte >> 4)
+    return moves[:count], 'O' if header & O_STARTS else 'X'
+
+
+def readGames(path=DEFAULT_PATH):
+    # yields (moves, starter) for every game in the log, reading a chunk at a time;
+    # a record cut short at the end (the writer was killed mid write) is left out
+    with open(path, 'rb') as f:
+        rest = b''
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                return
+            data = rest + chunk
+            i = 0
+            end = len(data)
+            while i < end and i + size(data[i]) <= end:
+                header = data[i]
+                if header & 0x0F > MAX_MOVES:
+                    raise ValueError(f"{path} isn't a game log (bad record at byte {f.tell() - end + i})")
+                yield decode(data, i)
+                i += size(header)
+            rest = data[i:]
+
+
+def replay(moves, starter='X'):
+    # the Bitboard and result ('X', 'O', 'Tie' or '') after the moves
+    from engine.bitboard import Bitboard
+
+    bits = Bitboard()
+    marks = (starter, 'O' if starter == 'X' else 'X')
+    for i, cell in enumerate(moves):
+        bits.play(cell, marks[i % 2])
+    return bits, bits.result()
+
+
+class GameLog(object):
+    # append only, written behind the caller's back: append() queues the record and
+    # returns, a thread writes whatever has piled up in one go
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.pending = queue.SimpleQueue()
+        self.error = None  # the OSError that stopped the writer, records are dropped after it
+        self.thread = threading.Thread(target=self.write, name='GameLog', daemon=True)
+        self.thread.start()
+
+    def append(self, moves, starter='X'):
+        self.appendRecords(encode(moves, starter))
+
+    def appendRecords(self, data):  # records already encoded, any number of them back to back
+        if self.error is None:  # once the writer has failed nothing would write them
+            self.pending.put(data)
+
+    def write(self):  # on the log's thread
+        done = False
+        try:
+            with open(self.path, 'ab') as f:
+                while not done:
+                    records = [self.pending.get()]
+                    while records[-1] is not None and not self.pending.empty():
+                        records.append(self.pending.get())
+                    if records[-1] is None:  # close() was called
+                        records.pop()
+                        done = True
+                    f.write(b''.join(records))
+                    f.flush()
+        except OSError as e:
+            self.error = e
+
+    def close(self):  # writes what is still queued, then stops the thread
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
@@ -0,0 +1,133 @@
+from time import perf_counter
+
+from engine.bitboard import CELLS, FULL, WIN_LINE
+from engine.deepening import Timeout
+from engine.symmetry import canonical, uniqueMoves
+from engine.trace import traced
+from engine.transposition import TranspositionTable, positionKey
+
+# center first, then corners, then edges - the center and the corners sit on more lines
+ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# what a transposition table entry tells about its score
+EXACT, LOWER, UPPER = 0, 1, 2
+
+WIN = 1  # scores are the same -1 / 0 / 1 the plain minimax always returned
+
+
+class Search(object):
+    # negamax with alpha-beta cutoffs, scores are from the side to move's point of view
+    def __init__(self, table=None):
+        self.table = table if table is not None else TranspositionTable()
+        self.killers = [-1] * 10  # per ply, last move that caused a cutoff there
+        self.nodes = 0
+        self.depth = 0  # deepest search think finished last time
+        self.deadline = None  # perf_counter time think has to stop at
+
+    @traced('Search.think', 'search', lambda search: {'nodes': search.nodes, 'depth': search.depth})
+    def think(self, bits, mark, budget=0.05, maxDepth=None):
+        # iterative deepening: depth 1, 2, 3... until budget seconds are used up, then the
+        # move of the deepest search that finished; with enough time it's bestMove's move
+        empty = FULL & ~(bits.x | bits.o)
+        best = next(cell for cell in ORDER if empty >> cell & 1)  # ready before depth 1 finishes
+        nodes = 0
+        self.depth = 0
+        self.deadline = perf_counter() + budget
+        try:
+            for depth in range(1, min(maxDepth or 9, bin(empty).count('1')) + 1):
+                try:
+                    move = self.bestMove(bits, mark, depth)
+                except Timeout:
+                    break
+                finally:
+                    nodes += self.nodes
+                best = move
+                self.depth = depth
+        finally:
+            self.deadline = None
+        self.nodes = nodes
+        return best
+
+    @traced('Search.bestMove', 'search', lambda search: {'nodes': search.nodes})
+    def bestMove(self, bits, mark, depth=9):
+        # mark is the side to move ('X' or 'O'), returns the same cell an exhaustive
+        # minimax picks: the lowest index among the best scoring moves
+        self.nodes = 0
+        if mark == 'X':
+            me, opp = bits.x, bits.o
+        else:
+            me, opp = bits.o, bits.x
+
+        bestScore = -WIN - 1
+        bestCell = -1
+        # symmetric moves score the same, so only the lowest cell of each group is searched
+        moves = uniqueMoves(me, opp, CELLS[FULL & ~(me | opp)])
+        moves.sort(key=ORDER.index)
+        for cell in moves:
+            # a move can only replace the best one if it scores higher, or the same
+            # and comes first on the board, so ties are searched with a wider window
+            alpha = bestScore - 1 if cell < bestCell else bestScore
+            score = -self.negamax(opp, me | (1 << cell), depth - 1, -WIN - 1, -alpha, 1)
+            if score > bestScore or (score == bestScore and cell < bestCell):
+                bestScore = score
+                bestCell = cell
+        self.score = bestScore
+        return bestCell
+
+    def orderMoves(self, me, opp, ply):
+        empty = FULL & ~(me | opp)
+        moves = [cell for cell in ORDER if empty >> cell & 1]
+        killer = self.killers[ply]
+        if killer in moves and moves[0] != killer:
+            moves.remove(killer)
+            moves.insert(0, killer)
+        return uniqueMoves(me, opp, moves)
+
+    def negamax(self, me, opp, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 63 and perf_counter() > self.deadline:
+            raise Timeout()
+
+        # opp just moved, so only opp can have a line
+        if WIN_LINE[opp] >= 0:
+            return -WIN
+        empty = FULL & ~(me | opp)
+        if not empty or depth <= 0:
+            return 0
+
+        # scores are from the side to move's point of view, so the key doesn't need to
+        # know which mark that is, only the canonical (me, opp) position
+        cme, copp, _ = canonical(me, opp)
+        key = positionKey(cme, copp, depth)
+        entry = self.table.get(key)
+        if entry is not None:
+            score, flag = entry
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        alphaStart = alpha
+        best = -WIN - 1
+        for cell in self.orderMoves(me, opp, ply):
+            score = -self.negamax(opp, me | (1 << cell), depth - 1, -beta, -alpha, ply + 1)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.killers[ply] = cell
+                        break
+
+        if best <= alphaStart:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.put(key, (best, flag))
+        return best
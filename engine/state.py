@@ -0,0 +1,67 @@
+from engine.bitboard import Bitboard
+from engine.board import Board
+from engine.trace import traced
+
+
+class GameState(object):
+    # one game of tic tac toe plus the turn bookkeeping the window used to do itself
+    __slots__ = ('bits', 'playerFlag', 'marks', 'winningLine', 'moves', 'undone')  # the server keeps thousands of these
+
+    def __init__(self, size=3, k=3):
+        # the classic game keeps the fast 3 x 3 bitboard, anything bigger gets a Board
+        self.bits = Bitboard() if (size, k) == (3, 3) else Board(size, k)
+        self.playerFlag = 0  # moves played in this game
+        self.marks = ['O', 'X']  # marks[0] moves first, swapped every new game
+        self.winningLine = None  # cells (numbered from 1) of the finished line
+        self.moves = []  # cells played, in order
+        self.undone = []  # cells taken back by undo, the next one to redo last
+
+    @property
+    def board(self):  # list view of the bitboards, one mark per cell
+        return self.bits.toList()
+
+    def newGame(self):
+        self.bits.clear()
+        self.playerFlag = 0
+        self.winningLine = None
+        self.moves = []
+        self.undone = []
+
+    def swapStarter(self):  # every new game is started by different player
+        self.marks[0], self.marks[1] = self.marks[1], self.marks[0]
+
+    def turn(self):  # mark that plays next
+        return self.marks[self.playerFlag % 2]
+
+    def starter(self):  # mark that moved first in this game
+        return self.marks[0]
+
+    def play(self, cell, mark, redo=False):
+        self.bits.play(cell, mark)
+        self.playerFlag += 1
+        self.moves.append(cell)
+        if not redo:  # a new move, what was undone can't come back
+            self.undone = []
+
+    def undo(self):  # takes back the last move, returns its cell
+        cell = self.moves.pop()
+        self.bits.undo(cell)
+        self.playerFlag -= 1
+        self.winningLine = None
+        self.undone.append(cell)
+        return cell
+
+    def redo(self):  # plays the last move undone again, returns its cell
+        cell = self.undone.pop()
+        self.play(cell, self.turn(), True)
+        return cell
+
+    @traced('checkGameOver', 'game')
+    def checkGameOver(self):  # 'X', 'O', 'Tie' or ''
+        winner, line = self.bits.winningLine()
+        if winner:
+            self.winningLine = tuple(cell + 1 for cell in self.bits.lineCells(line))
+            return winner
+        if self.bits.isFull():
+            return 'Tie'
+        return ''
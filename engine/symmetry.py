@@ -0,0 +1,81 @@
+# the 8 symmetries of the board (4 rotations, each optionally mirrored)
+#
+#   0 1 2
+#   3 4 5
+#   6 7 8
+#
+# PERMS[s][cell] is where cell ends up after symmetry s, PERMS[0] changes nothing
+from engine.bitboard import FULL
+
+
+def _rotate(cell):  # quarter turn clockwise
+    row, col = divmod(cell, 3)
+    return col * 3 + (2 - row)
+
+
+def _mirror(cell):  # left <-> right
+    row, col = divmod(cell, 3)
+    return row * 3 + (2 - col)
+
+
+def _build():
+    perms = []
+    perm = tuple(range(9))
+    for _ in range(4):
+        perms.append(perm)
+        perms.append(tuple(_mirror(perm[cell]) for cell in range(9)))
+        perm = tuple(_rotate(perm[cell]) for cell in range(9))
+    # keep the identity first so symmetry 0 always means "nothing to undo"
+    return tuple(perms)
+
+
+PERMS = _build()
+INVERSE = tuple(tuple(perm.index(cell) for cell in range(9)) for perm in PERMS)
+
+
+def _transform(perm):
+    # built from the board without its lowest cell, so each entry costs one step
+    table = [0] * (FULL + 1)
+    for bits in range(1, FULL + 1):
+        low = bits & -bits
+        table[bits] = table[bits ^ low] | 1 << perm[low.bit_length() - 1]
+    return tuple(table)
+
+
+# TRANSFORM[s][bits] moves a whole bitboard at once
+TRANSFORM = tuple(_transform(perm) for perm in PERMS)
+UNTRANSFORM = tuple(_transform(perm) for perm in INVERSE)
+
+
+def canonical(a, b):
+    # (a, b, s): the smallest of the 8 images of the position and the symmetry that made it
+    best = (a << 9 | b, 0)
+    for s in range(1, 8):
+        table = TRANSFORM[s]
+        key = table[a] << 9 | table[b]
+        if key < best[0]:
+            best = (key, s)
+    key, s = best
+    return key >> 9, key & FULL, s
+
+
+def maskFromCanonical(mask, s):
+    return UNTRANSFORM[s][mask]
+
+
+def uniqueMoves(a, b, cells):
+    # keep one move of every group the position's own symmetries make equivalent,
+    # the first one in cells wins
+    same = [s for s in range(1, 8) if TRANSFORM[s][a] == a and TRANSFORM[s][b] == b]
+    if not same:
+        return list(cells)
+    moves = []
+    seen = 0
+    for cell in cells:
+        if seen >> cell & 1:
+            continue
+        moves.append(cell)
+        seen |= 1 << cell
+        for s in same:
+            seen |= 1 << PERMS[s][cell]
+    return moves
@@ -0,0 +1,208 @@
+# perfect play for every reachable position, solved once and stored in a small binary file
+#
+# positions are stored from the side to move's point of view (me / opp bitboards),
+# so the same entry works whoever started the game and whichever mark the computer has
+# only canonical positions (see engine.symmetry) are solved and stored, lookups
+# canonicalize first and turn the best moves back into the real board's cells
+#
+# file layout: 8 byte header, then one little endian uint16 per base 3 index
+#   bits 0-8   cells that reach the best result (best moves)
+#   bits 9-10  result for the side to move: 0 unreachable, 1 loss, 2 draw, 3 win
+#   bits 11-14 plies until the game ends with perfect play
+#
+# the file is the engine's persistent cache: solved on the first run, then memory mapped
+# read only by every later session, so any number of game processes share one copy
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+
+from engine.base3 import SLOTS, index, table
+from engine.bitboard import CELLS, FULL, WIN_LINE
+from engine.symmetry import canonical, maskFromCanonical
+
+MAGIC = b'TTTB\x02\x00\x00\x00'
+ENTRY = struct.Struct('<H')
+
+LOSS, DRAW, WIN = 1, 2, 3
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tablebase.bin')
+
+
+def encode(moves, result, plies):
+    return moves | (result << 9) | (plies << 11)
+
+
+def decode(entry):  # (best moves mask, result, plies)
+    return entry & FULL, (entry >> 9) & 3, (entry >> 11) & 15
+
+
+def solve():
+    # negamax over every reachable position, returns the table as an array of entries
+    # indexed by base 3 position (1 for the side to move, 2 for the other one)
+    entries = table('H')
+
+    def score(entry):  # sortable score: faster wins and slower losses are better
+        moves, result, plies = decode(entry)
+        if result == WIN:
+            return 10 - plies
+        if result == LOSS:
+            return plies - 10
+        return 0
+
+    def visit(me, opp):  # me, opp must already be canonical
+        i = index(me, opp)
+        if entries[i]:
+            return entries[i]
+
+        if WIN_LINE[opp] >= 0:  # opp just made a line
+            entries[i] = encode(0, LOSS, 0)
+            return entries[i]
+        empty = FULL & ~(me | opp)
+        if not empty:
+            entries[i] = encode(0, DRAW, 0)
+            return entries[i]
+
+        best = None
+        moves = 0
+        for cell in CELLS[empty]:
+            a, b, _ = canonical(opp, me | (1 << cell))
+            child = -score(visit(a, b))
+            # one more ply for this side
+            if child > 0:
+                child -= 1
+            elif child < 0:
+                child += 1
+            if best is None or child > best:
+                best = child
+                moves = 1 << cell
+            elif child == best:
+                moves |= 1 << cell
+
+        if best > 0:
+            entries[i] = encode(moves, WIN, 10 - best)
+        elif best < 0:
+            entries[i] = encode(moves, LOSS, best + 10)
+        else:
+            entries[i] = encode(moves, DRAW, bin(empty).count('1'))
+        return entries[i]
+
+    visit(0, 0)
+    return entries
+
+
+def build():  # the whole file's contents, solved in memory
+    entries = solve()
+    if sys.byteorder != 'little':
+        entries.byteswap()
+    return MAGIC + entries.tobytes()
+
+
+def write(path, data):
+    # write next to the target and swap it in, so a reader never sees half a file;
+    # every writer gets its own temporary file, so processes solving at the same time
+    # can't write into each other's, the last one to finish just replaces the same contents
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())  # on disk before it gets the real name
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def generate(path=DEFAULT_PATH):
+    data = build()
+    write(path, data)
+    return sum(1 for entry, in ENTRY.iter_unpack(data[len(MAGIC):]) if entry)
+
+
+def valid(data):
+    return bytes(data[:len(MAGIC)]) == MAGIC and len(data) == len(MAGIC) + SLOTS * ENTRY.size
+
+
+class Tablebase(object):
+    def __init__(self, data, file=None):
+        if not valid(data):
+            raise ValueError("Not a tablebase file (or an old version), run: python make_tablebase.py")
+        self.data = data
+        self.file = file
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        # memory map the file (read only, shared with every other process that maps it),
+        # solving it first if it is missing or from an old version
+        table = cls._open(path)
+        if table is not None:
+            return table
+        data = build()
+        try:
+            write(path, data)
+        except OSError:
+            return cls(data)  # can't write there (read only install), keep it in memory
+        return cls._open(path) or cls(data)
+
+    @classmethod
+    def _open(cls, path):  # the mapped file, None if it isn't there or isn't usable
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # empty file
+            f.close()
+            return None
+        if not valid(data):
+            data.close()
+            f.close()
+            return None
+        return cls(data, f)
+
+    def close(self):
+        if self.file is not None:
+            self.data.close()
+            self.file.close()
+            self.file = None
+
+    def entry(self, me, opp):
+        # entry with the best moves already mapped back onto this board
+        me, opp, s = canonical(me, opp)
+        entry = ENTRY.unpack_from(self.data, len(MAGIC) + 2 * index(me, opp))[0]
+        return (entry & ~FULL) | maskFromCanonical(entry & FULL, s)
+
+    def result(self, me, opp):  # LOSS, DRAW, WIN for the side to move, 0 if unreachable
+        return (self.entry(me, opp) >> 9) & 3
+
+    def playable(self, me, opp):
+        # entry of a position the side to move can play on, ValueError for any other
+        entry = self.entry(me, opp)
+        if not (entry >> 9) & 3:
+            raise ValueError("That position can't happen in a game.")
+        if not entry & FULL:
+            raise ValueError("The game is over.")
+        return entry
+
+    def bestMoves(self, me, opp):
+        return CELLS[self.playable(me, opp) & FULL]
+
+    def bestMove(self, me, opp, choose=random.choice):
+        # any of the best moves, picked at random so the computer doesn't always play the same game
+        return choose(self.bestMoves(me, opp))
+
+    def moveValues(self, me, opp):
+        # {cell: (result, plies)} for the side to move: what playing the cell leads to with
+        # perfect play, and in how many plies (this move included) the game is over
+        self.playable(me, opp)
+        flip = {LOSS: WIN, DRAW: DRAW, WIN: LOSS}
+        values = {}
+        for cell in CELLS[FULL & ~(me | opp)]:
+            entry = self.entry(opp, me | (1 << cell))
+            values[cell] = (flip[(entry >> 9) & 3], ((entry >> 11) & 15) + 1)
+        return values
@@ -0,0 +1,110 @@
+# opt-in timing spans with counters (nodes, cache hits...) as their args, saved as a
+# Chrome trace (chrome://tracing or ui.perfetto.dev)
+#
+#   TICTACTOE_TRACE=trace.json python game.py        or: python play.py --trace trace.json
+#
+# the variable is read once, at import: without it traced() hands every function back
+# untouched and enabled is False, so the hot paths run exactly the code they did before
+# with it, the trace is written (and a summary printed) when the program exits
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+PATH = os.environ.get('TICTACTOE_TRACE')
+enabled = bool(PATH)
+
+events = []  # Chrome trace events, appended from any thread (list.append holds the GIL)
+_origin = time.perf_counter()
+_pid = os.getpid()
+
+
+def now():  # microseconds since the module was imported, the trace's clock
+    return (time.perf_counter() - _origin) * 1e6
+
+
+def complete(name, cat, start, args=None):
+    # a span from start (a now() value) until now, on the calling thread
+    event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': start, 'dur': now() - start,
+             'pid': _pid, 'tid': threading.get_ident()}
+    if args:
+        event['args'] = args
+    events.append(event)
+
+
+def traced(name, cat='engine', args=None, before=None):
+    # decorator: a span per call when tracing, the function itself otherwise
+    # args(first argument) -> dict is read after the call, e.g. the engine's node count;
+    # with before, args(first argument, before(first argument)) so it can tell what the call added
+    def wrap(function):
+        if not enabled:
+            return function
+
+        @functools.wraps(function)
+        def call(*a, **kw):
+            snapshot = before(a[0]) if before and a else None
+            start = now()
+            try:
+                return function(*a, **kw)
+            finally:
+                if args and a:
+                    complete(name, cat, start, args(a[0], snapshot) if before else args(a[0]))
+                else:
+                    complete(name, cat, start)
+        return call
+    return wrap
+
+
+def exclusive(spans):
+    # {id(span): its time less that of the spans nested directly inside it}, spans of one thread
+    own = {}
+    enclosing = []  # the spans enclosing the current one, outermost first
+    for event in sorted(spans, key=lambda e: (e['ts'], -e['dur'])):
+        while enclosing and enclosing[-1]['ts'] + enclosing[-1]['dur'] <= event['ts']:
+            enclosing.pop()
+        own[id(event)] = event['dur']
+        if enclosing:
+            own[id(enclosing[-1])] -= event['dur']
+        enclosing.append(event)
+    return own
+
+
+def summary(out=sys.stderr):
+    # per span name: inclusive time (nested spans counted in it) and self time (without them);
+    # per category self time only, so nothing is counted twice and the categories add up to
+    # at most the time traced
+    threads = {}
+    for event in events:
+        if event['ph'] == 'X':
+            threads.setdefault(event['tid'], []).append(event)
+    totals = {}
+    for spans in threads.values():
+        own = exclusive(spans)
+        for event in spans:
+            row = totals.setdefault((event['cat'], event['name']), [0, 0.0, 0.0])
+            row[0] += 1
+            row[1] += event['dur']
+            row[2] += own[id(event)]
+    print(f"{'span':<28} {'calls':>8} {'incl ms':>10} {'self ms':>10} {'mean incl':>9}", file=out)
+    for (cat, name), (calls, total, selfTime) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        print(f"{cat + '/' + name:<28} {calls:>8} {total / 1000:>10.3f} {selfTime / 1000:>10.3f} "
+              f"{total / calls / 1000:>9.4f}", file=out)
+    for cat in sorted({cat for cat, _ in totals}):
+        selfTime = sum(t for (c, _), (_, _, t) in totals.items() if c == cat)
+        print(f"{cat + ' (self)':<28} {'':>8} {'':>10} {selfTime / 1000:>10.3f}", file=out)
+
+
+def save(path=PATH):
+    names = [{'name': 'thread_name', 'ph': 'M', 'pid': _pid, 'tid': thread.ident, 'args': {'name': thread.name}}
+             for thread in threading.enumerate()]
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': names + events, 'displayTimeUnit': 'ms'}, f)
+    print(f"trace: {len(events)} events written to {path}", file=sys.stderr)
+    summary()
+
+
+if enabled:
+    atexit.register(save)
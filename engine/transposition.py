@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+UNLIMITED = 15  # the deepest depth a key holds, a 3 x 3 search ends well before it
+
+
+def positionKey(me, opp, depth):
+    # pack board and remaining depth into one int; scores are for the side to move, so
+    # the board is (its cells, the other side's) and the key needs no mark
+    # layout: [ me bits (9) | opp bits (9) | depth (4 bits) ]
+    return (me << 13) | (opp << 4) | min(max(depth, 0), UNLIMITED)
+
+
+class TranspositionTable(object):
+    # bounded cache of minimax scores, least recently used entry is dropped first
+    def __init__(self, maxSize=1 << 16):
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        score = self.entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, key, score):
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
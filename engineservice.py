@@ -0,0 +1,232 @@
+# the computer player as a local service, for other programs that want a best move
+#
+#   python engineservice.py                   listen on a unix socket (tictactoe-engine.sock in the temp dir)
+#   python engineservice.py --port 8766       listen on 127.0.0.1:8766 instead
+#
+# same lines as play.py --engine, any number of them in flight on a connection:
+#   -> X........ hard O        board [level] [mark] [k], cells by row
+#   <- 5                       the cell to play, from 1, or "error: ..."
+#   -> stats                   <- one line of JSON: counters, queue depth and latency
+# answers come back in the order the requests were sent
+#
+# requests that arrive while the engine is busy wait in a queue and are answered together
+# as the next batch; a batch works out each distinct request once, and answers that follow
+# from the position alone (not the random level or a time budget) are kept in a cache
+# shared by all the connections
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import Engine
+from play import answer
+from timing import percentile
+
+SOCKET = os.path.join(tempfile.gettempdir(), 'tictactoe-engine.sock')
+MAX_LINE = 256  # bytes, a 15 x 15 board and its options fit easily
+
+
+class Service(object):
+    def __init__(self, maxBatch=256, cacheSize=1 << 16, window=0.0):
+        self.engine = Engine()
+        self.pool = ThreadPoolExecutor(1)  # the engine works on its own thread, the event loop only does IO
+        self.maxBatch = maxBatch
+        self.window = window  # seconds to wait for more requests before starting a batch
+        self.cache = OrderedDict()  # request -> answer, least recently used first
+        self.cacheSize = cacheSize
+        self.queue = deque()  # (request, future, arrival time)
+        self.ready = None  # asyncio.Event, set while the queue isn't empty
+
+        self.requests = 0
+        self.batches = 0
+        self.solved = 0  # requests the engine worked out
+        self.cached = 0  # answered from the cache
+        self.repeats = 0  # answered by the same request earlier in the batch
+        self.maxQueue = 0
+        self.latencies = deque(maxlen=10000)  # seconds, the most recent requests only
+
+    def submit(self, request):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.append((request, future, time.perf_counter()))
+        self.requests += 1
+        self.maxQueue = max(self.maxQueue, len(self.queue))
+        self.ready.set()
+        return future
+
+    async def batcher(self):
+        while True:
+            await self.ready.wait()
+            if self.window and len(self.queue) < self.maxBatch:
+                await asyncio.sleep(self.window)
+            batch = [self.queue.popleft() for _ in range(min(self.maxBatch, len(self.queue)))]
+            if not self.queue:
+                self.ready.clear()
+            try:
+                await self.answerBatch(batch)
+            except Exception as e:  # a bug of ours, the batch gets it and the next one still runs
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def answerBatch(self, batch):
+        loop = asyncio.get_running_loop()
+        replies = [None] * len(batch)
+        todo = []  # requests for the engine
+        waiting = []  # for each of them, the places in the batch its reply goes to
+        shared = {}  # cacheable request -> its places, repeats of it in the batch wait for the same reply
+        for i, (request, _, _) in enumerate(batch):
+            if not self.cacheable(request.split()):  # asked twice, answered twice
+                todo.append(request)
+                waiting.append([i])
+            elif request in shared:
+                self.repeats += 1
+                shared[request].append(i)
+            elif request in self.cache:
+                self.cached += 1
+                self.cache.move_to_end(request)
+                replies[i] = self.cache[request]
+            else:
+                shared[request] = [i]
+                todo.append(request)
+                waiting.append(shared[request])
+        if todo:
+            solved = await loop.run_in_executor(self.pool, self.solve, todo)
+            for request, reply, places in zip(todo, solved, waiting):
+                for i in places:
+                    replies[i] = reply
+                if self.cacheSize and request in shared and not reply.startswith('error: '):
+                    self.cache[request] = reply
+            while len(self.cache) > self.cacheSize:
+                self.cache.popitem(last=False)
+        self.solved += len(todo)
+        self.batches += 1
+
+        now = time.perf_counter()
+        for (request, future, arrived), reply in zip(batch, replies):
+            if not future.done():  # its connection may have gone
+                future.set_result(reply)
+            self.latencies.append(now - arrived)
+
+    def solve(self, requests):  # on the engine's thread
+        replies = []
+        for request in requests:
+            try:
+                replies.append(answer(self.engine, request.split()))
+            except Exception as e:  # one bad request mustn't take the batch down with it
+                replies.append(f"error: {type(e).__name__}: {e}")
+        return replies
+
+    def cacheable(self, words):  # whether the level asked for always answers a position the same way
+        size = int(len(words[0]) ** 0.5)
+        k = int(words[3]) if len(words) > 3 and words[3].isdigit() else min(size, 5)
+        levels = self.engine.levels if (size, k) == (3, 3) else self.engine.gridLevels
+        return getattr(levels.get(words[1] if len(words) > 1 else 'hard'), 'cacheable', False)
+
+    def stats(self):
+        latencies = list(self.latencies)
+        return {'requests': self.requests, 'batches': self.batches,
+                'batchSize': round((self.solved + self.cached + self.repeats) / self.batches, 2) if self.batches else 0,
+                'solved': self.solved, 'cached': self.cached, 'repeats': self.repeats,
+                'queue': len(self.queue), 'maxQueue': self.maxQueue,
+                'p50Ms': round(percentile(latencies, 50) * 1000, 3),
+                'p99Ms': round(percentile(latencies, 99) * 1000, 3)}
+
+    async def handle(self, reader, writer):
+        replies = asyncio.Queue()  # futures in request order, written back by send()
+        sender = asyncio.ensure_future(self.send(replies, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than MAX_LINE
+                    replies.put_nowait(self.done("error: request too long"))
+                    break
+                if not line:
+                    break
+                request = ' '.join(line.decode(errors='replace').split())
+                if request == 'stats':
+                    replies.put_nowait(self.done(json.dumps(self.stats(), separators=(',', ':'))))
+                elif request:
+                    replies.put_nowait(self.submit(request))
+        except ConnectionError:
+            pass
+        finally:
+            replies.put_nowait(None)
+            await sender
+            writer.close()
+
+    def done(self, reply):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(reply)
+        return future
+
+    async def send(self, replies, writer):
+        try:
+            while True:
+                future = await replies.get()
+                if future is None:
+                    return
+                try:
+                    reply = await future
+                except Exception as e:
+                    reply = f"error: {type(e).__name__}: {e}"
+                writer.write(reply.encode() + b'\n')
+                if replies.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def report(self, every):
+        while True:
+            await asyncio.sleep(every)
+            print(json.dumps(self.stats()), flush=True)
+
+    async def serve(self, host, port, path, every):
+        self.ready = asyncio.Event()
+        if port is None:
+            if os.path.exists(path):
+                os.remove(path)  # left behind by a service that was killed
+            server = await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE)
+            where = path
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+            where = ', '.join(str(s.getsockname()[:2]) for s in server.sockets)
+        print(f"listening on {where}", flush=True)
+        tasks = [asyncio.ensure_future(self.batcher())]
+        if every:
+            tasks.append(asyncio.ensure_future(self.report(every)))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer computer moves over a local socket")
+    parser.add_argument('--socket', default=SOCKET, help="unix socket path")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="listen on TCP instead of the unix socket, 0 picks a free port")
+    parser.add_argument('--max-batch', type=int, default=256, help="requests answered together, 1 answers them one by one")
+    parser.add_argument('--cache', type=int, default=1 << 16, help="answers kept, 0 for no cache")
+    parser.add_argument('--window', type=float, default=0.0, help="ms to wait for more requests before a batch")
+    parser.add_argument('--every', type=float, default=0.0, help="seconds between stats lines, 0 for none")
+    args = parser.parse_args()
+    if args.port is None and not hasattr(asyncio, 'start_unix_server'):
+        parser.error("no unix sockets here, use --port")
+
+    service = Service(max(1, args.max_batch), max(0, args.cache), args.window / 1000)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.socket, args.every))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
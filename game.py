@@ -1,133 +1,80 @@
-from PyQt5 import QtCore, QtGui, QtWidgets, QtTest
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QToolButton
 from PyQt5.QtCore import QSize
-import random
+
+import assets
+from boardwidget import BoardWidget
+from styles import STYLESHEET, StyleUpdater
+from engine import Engine, GameState
+from engine.record import GameLog
+from engine.trace import traced
+from worker import Analyst, ComputerPlayer
 
 
 class Ui_MainWindow(object):
     def __init__(self):
-        self.playerFlag = 0  # who's turn
-        self.marks = ['O', 'X']
         self.playerX = 0
         self.PlayerO = 0
-        self.winningLineColor = (141, 235, 152)  # color for win line
-        self.drawColor = (163, 163, 163)  # color for a draw
-        self.board = [' ' for _ in range(9)]  # board for minimax algorithm
-
-    def computerMove(self, level):
-        if level == "easy":
-            return self.easyMove()
-        elif level == "medium":
-            return self.mediumMove()
-        elif level == "hard":
-            return self.hardMove()
-        else:
-            raise ValueError("Invalid level. Choose from 'easy', 'medium', or 'hard'.")
-
-    def easyMove(self):
-        # Choose the worst-case move (minimizing)
-        return self.minimaxMove(depth=1, maximizing=False)
-
-    def mediumMove(self):
-        # Choose a random move
-        empty_positions = [i for i in range(len(self.board)) if self.board[i] == " "]
-        return random.choice(empty_positions)
-
-    def hardMove(self):
-        # Choose the best move (maximizing)
-        return self.minimaxMove(depth=4, maximizing=True)
-    
-    def minimaxMove(self, depth, maximizing):
-        best_score = float('-inf') if maximizing else float('inf')
-        best_move = -1
-
-        for i in range(len(self.board)):
-            if self.board[i] == " ":
-                self.board[i] = 'O' if maximizing else 'X'
-                score = self.minimax(depth - 1, not maximizing)
-                self.board[i] = ' '
-
-                if maximizing:
-                    if score > best_score:
-                        best_score = score
-                        best_move = i
-                else:
-                    if score < best_score:
-                        best_score = score
-                        best_move = i
-
-        return best_move
-
-    def minimax(self, depth, maximizing):
-        result = self.checkGameOver()
-        if result == 'X':
-            return -1
-        elif result == 'O':
-            return 1
-        elif result == 'Tie':
-            return 0
-
-        if depth == 0:
-            return 0
-
-        if maximizing:
-            best_score = float('-inf')
-            for i in range(len(self.board)):
-                if self.board[i] == " ":
-                    self.board[i] = 'O'
-                    score = self.minimax(depth - 1, False)
-                    self.board[i] = ' '
-                    best_score = max(best_score, score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(len(self.board)):
-                if self.board[i] == " ":
-                    self.board[i] = 'X'
-                    score = self.minimax(depth - 1, False)
-                    self.board[i] = ' '
-                    best_score = min(best_score, score)
-            return best_score
-   
-
+        self.styles = StyleUpdater()  # cell and score colors, re-polished once per batch
+        self.state = GameState()  # board and turns of the game being played
+        self.computerPlayer = ComputerPlayer(delay=700)  # msecs the computer waits before moving
+        self.computerPlayer.moveReady.connect(self.computerMoved)
+        self.thinking = False  # True while the computer is picking its move
+        self.engine = Engine()  # picks the computer's moves, keeps its caches between games
+        self.analyst = Analyst()  # works out the analysis overlay on a thread of its own
+        self.analyst.valuesReady.connect(self.showValues)
+        self.analysisEngine = Engine()  # only used on the analyst's thread
+        self.level = 'easy'  # computer level, picked on the level screen
+        self.stack = None  # holds the menu, level and game screens once they are built
+        self.gameLog = None  # finished games are appended to it, main() opens it
+
+    @property
+    def board(self):  # list view of the board, one mark per cell
+        return self.state.board
+
+    def computerMove(self, level, bits=None):
+        # bits is the board to move on, the current game's if it isn't given
+        if bits is None:
+            bits = self.state.bits
+        return self.engine.computerMove(bits, level)
+
+    @traced('btnClk', 'ui')
     def btnClk(self, btn):  # On Button Click
+        if self.thinking:  # it's the computer's turn, wait for it
+            return
+
         mark = ''  # current player
 
         # switch between X and O so they are assigned easily
         # we do this so that every new game is started by different player
-        if self.playerFlag == 0:
-            self.marks[0], self.marks[1] = self.marks[1], self.marks[0]
+        # (not when every move was undone, it's still the same game)
+        if self.state.playerFlag == 0 and not self.state.undone:
+            self.state.swapStarter()
 
         # Check Who's Turn it is
-        if self.playerFlag % 2 == 0:
-            mark = self.marks[0]
-        else:
-            mark = self.marks[1]
+        mark = self.state.turn()
 
         # Change color by player's turn
         if mark == 'X':
-            self.oScore.setStyleSheet(
-                "color: red")
-            self.xScore.setStyleSheet("color: black")
+            self.styles.set(self.oScore, 'turn', 'next')
+            self.styles.set(self.xScore, 'turn', 'waiting')
         else:
-            self.xScore.setStyleSheet("color: red")
-            self.oScore.setStyleSheet("color: black")
+            self.styles.set(self.xScore, 'turn', 'next')
+            self.styles.set(self.oScore, 'turn', 'waiting')
 
         # this condition is handy after reset is called second time in computer game
-        # btn == 10 gurantees that it is called from gameReset Function (so we didn't press any button)
-        # if it is first move against computer, it's player's move and btn is 10(no button)
-        if not self.playerFlag and mark == 'X' and btn == 10 and not self.friend:
-            # we simply return but before that we have to revert changes we made to self.marks earlier in this function
-            self.marks[0], self.marks[1] = self.marks[1], self.marks[0]
+        # btn == 0 gurantees that it is called from gameReset Function (so we didn't press any button)
+        # if it is first move against computer, it's player's move and btn is 0(no button)
+        if not self.state.playerFlag and mark == 'X' and btn == 0 and not self.friend:
+            # we simply return but before that we have to revert changes we made to the marks earlier in this function
+            self.state.swapStarter()
             return
 
         # not (if we are playing against computer, while is it a first move and mask='O' - it is computer's move)
-        if not(not self.playerFlag and mark == 'O' and not self.friend):
+        if not(not self.state.playerFlag and mark == 'O' and not self.friend):
             self.buttons[btn-1].setText(mark)
             self.buttons[btn-1].setDisabled(True)
-            self.board[btn-1] = mark
-            self.playerFlag += 1
+            self.state.play(btn-1, mark)
 
         # Check if anyone won Everytime Button is Clicked
         result = self.checkGameOver(True)
@@ -136,67 +83,41 @@ class Ui_MainWindow(object):
 
         # after every move Computer is going to do its move here
         elif not self.friend:
-            # make computer wait some time
-            if btn == 10:
-                # reason i have only 1 ms here is that this is the first move computer makes
-                # which takes a lot of time anyway
-                # setting it to 1 makes it automatically go to next frame and then start calculation
-                QtTest.QTest.qWait(1)
-            else:
-                QtTest.QTest.qWait(700)  # msecs
-
-            # set computer's move
-            pos = self.computerMove(self.level)
-            self.board[pos] = 'O'
-            button = self.buttons[pos]
-            button.setText("O")
-            button.setDisabled(True)
-            self.playerFlag += 1
-
-            # Chech again after computer made its move
-            result = self.checkGameOver(True)
-            if result != '':  # gameover
-                self.finishGame(result)
+            # make computer wait some time (without blocking the window)
+            # the first move of a game doesn't wait, the player hasn't done anything yet
+            self.askComputer(0 if btn == 0 else self.computerPlayer.delay)
+        self.refreshAnalysis()
+
+    def askComputer(self, delay):
+        # the computer thinks on a worker thread, on a copy of the board
+        # computerMoved gets its answer
+        self.thinking = True
+        board = self.state.bits.copy()
+        level = self.level
+        self.computerPlayer.request(lambda: self.computerMove(level, board), delay)
+
+    @traced('computerMoved', 'ui')
+    def computerMoved(self, pos):  # set computer's move
+        self.thinking = False
+        self.state.play(pos, 'O')
+        button = self.buttons[pos]
+        button.setText("O")
+        button.setDisabled(True)
+
+        # Chech again after computer made its move
+        result = self.checkGameOver(True)
+        if result != '':  # gameover
+            self.finishGame(result)
+        self.refreshAnalysis()
 
     def checkGameOver(self, color=False):  # Check if Game is Over
-        # color=False - so that when minimax calls it, self.winningLine doesn't change unnecessarily
-        def checkLine(b1, b2, b3):  # reuse and simplify checking
-            if self.board[b1-1] == self.board[b2-1] == self.board[b3-1] and self.board[b1-1] != " ":
-                return True
-            return False
-
-        winner = ''
-
-        # Horizontal Lines
-        for i in range(1, 10, 3):
-            if checkLine(i, i+1, i+2):
-                if color:
-                    self.winningLine = (i, i+1, i+2)
-                return self.board[i-1]
-
-        # Vertical Lines
-        for i in range(1, 4):
-            if checkLine(i, i+3, i+6):
-                if color:
-                    self.winningLine = (i, i+3, i+6)
-                return self.board[i-1]
-
-        # Diagonal Lines
-        if checkLine(1, 5, 9):
-            if color:
-                self.winningLine = (1, 5, 9)
-            return self.board[0]
-        elif checkLine(3, 5, 7):
-            if color:
-                self.winningLine = (3, 5, 7)
-            return self.board[2]
-
-        # Draw
-        elif self.board.count(' ') == 0:
-            return 'Tie'
-
-        return winner  # returns ''
+        # color=True keeps the winning line for finishGame to color, undo and the analysis only ask who won
+        result = self.state.checkGameOver()
+        if color and result not in ('', 'Tie'):
+            self.winningLine = self.state.winningLine
+        return result
 
+    @traced('finishGame', 'ui')
     def finishGame(self, winner):  # takes care of coloring and labeling
         if winner == 'X':  # if X wins
             self.playerX += 1
@@ -210,8 +131,7 @@ class Ui_MainWindow(object):
             self.winner.setText("Draw!")
             # Change color If Draw
             for button in self.buttons:
-                button.setStyleSheet(
-                    f"background-color:rgb({str(self.drawColor[0])},{str(self.drawColor[1])},{str(self.drawColor[2])})")
+                self.styles.set(button, 'cell', 'draw')
 
         # disable all the buttons
         for button in self.buttons:
@@ -222,22 +142,112 @@ class Ui_MainWindow(object):
             self.changeColor(
                 self.winningLine[0], self.winningLine[1], self.winningLine[2])
 
+    def undoMove(self):  # take back the last move, against the computer the player's last move
+        # the computer's opening move stays, or it would have to play it again
+        first = 1 if not self.friend and self.state.starter() == 'O' else 0
+        if len(self.state.moves) <= first:  # nothing to undo, the computer may still be opening
+            return
+        self.computerPlayer.cancel()
+        self.thinking = False
+
+        # a finished game isn't won anymore
+        result = self.checkGameOver()
+        if result == 'X':
+            self.playerX -= 1
+            self.xScore.setText('Player X: ' + str(self.playerX))
+        elif result == 'O':
+            self.PlayerO -= 1
+            self.oScore.setText(self.oLabel + str(self.PlayerO))
+
+        self.state.undo()
+        while not self.friend and self.state.turn() == 'O' and len(self.state.moves) > first:
+            self.state.undo()
+        self.showBoard()
+        self.refreshAnalysis()
+
+    def redoMove(self):  # play again what undo took back
+        if self.thinking or not self.state.undone:
+            return
+        self.state.redo()
+        while not self.friend and self.state.turn() == 'O' and self.state.undone:
+            self.state.redo()
+        self.showBoard()
+
+        result = self.checkGameOver(True)
+        if result != '':
+            self.finishGame(result)
+        elif not self.friend and self.state.turn() == 'O':  # the computer's move was never played
+            self.askComputer(self.computerPlayer.delay)
+        self.refreshAnalysis()
+
+    @traced('showBoard', 'ui')
+    def showBoard(self):  # buttons and turn colors from the state, after undo or redo
+        for cell, button in enumerate(self.buttons):
+            mark = self.state.bits[cell]
+            button.setText('' if mark == ' ' else mark)
+            button.setDisabled(mark != ' ')
+            self.styles.set(button, 'cell', '')
+        self.winner.setText("")
+        self.addShortcuts()  # setText dropped them on the cells that were freed
+        nextTurn = self.state.turn() if self.state.playerFlag else ''
+        self.styles.set(self.xScore, 'turn', {'X': 'next', 'O': 'waiting'}.get(nextTurn, ''))
+        self.styles.set(self.oScore, 'turn', {'O': 'next', 'X': 'waiting'}.get(nextTurn, ''))
+
+    def refreshAnalysis(self):
+        # what each free cell is worth for whoever moves next, while it's a player's turn
+        self.analyst.cancel()  # values for the old board aren't wanted anymore
+        if not self.analysisB.isChecked() or self.thinking or self.checkGameOver():
+            self.showValues({})
+            return
+        board = self.state.bits.copy()
+        mark = self.state.turn()  # on the empty board both sides get the same values anyway
+        self.analyst.request(lambda: self.analysisEngine.analyse(board, mark))
+
+    @traced('showValues', 'ui')
+    def showValues(self, values):  # {cell: (result, plies)} -> text and color on the free cells
+        for cell, button in enumerate(self.buttons):
+            if cell in values:
+                result, plies = values[cell]
+                hint = ('', 'loss', 'draw', 'win')[result]
+                button.setText(hint if hint == 'draw' else f"{hint} {plies}")
+                self.styles.set(button, 'hint', hint)
+            elif button.property('hint'):
+                self.styles.set(button, 'hint', '')
+                if self.state.bits[cell] == ' ':
+                    button.setText("")
+        self.addShortcuts()  # setText dropped the keypad shortcuts of the cells it changed
+
+    def logGame(self):  # a finished game goes in the log when the board is cleared
+        if self.gameLog is not None and self.state.moves and self.checkGameOver():
+            self.gameLog.append(self.state.moves, self.state.starter())
+
+    def closeLog(self):  # when the app quits
+        self.logGame()
+        if self.gameLog is not None:
+            self.gameLog.close()
+            self.gameLog = None
+
     def gameReset(self):  # Start Game Over
+        # forget the move the computer may still be thinking about
+        self.computerPlayer.cancel()
+        self.thinking = False
+        self.logGame()
+
         for button in self.buttons:
             button.setDisabled(False)
             button.setText("")
-            button.setStyleSheet('background-color: None')
-            self.board = [' ' for _ in range(9)]  # reset board
+            self.styles.set(button, 'cell', '')
 
+        self.state.newGame()  # reset board
         self.winner.setText("")
-        self.playerFlag = 0
 
         # to reset shortcuts (idk why)
         self.addShortcuts()
 
-        # if it is against computer pass in 10 since is doesn't map to any button
+        # if it is against computer pass in 0 since cells are numbered from 1
         if not self.friend:
-            self.btnClk(10)
+            self.btnClk(0)
+        self.refreshAnalysis()
 
     def addShortcuts(self):  # assign shortcuts to the keys
         _translate = QtCore.QCoreApplication.translate
@@ -249,27 +259,97 @@ class Ui_MainWindow(object):
                 "MainWindow", f"{buttonsToKeys[i+1]}"))
 
     def changeColor(self, b1, b2, b3):  # Change Color of a Winning Line
-        self.buttons[b1-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
-        self.buttons[b2-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
-        self.buttons[b3-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
+        for b in (b1, b2, b3):
+            self.styles.set(self.buttons[b-1], 'cell', 'win')
 
     def startup(self, MainWindow):  # first window that shows up
+        # coming back from a game, the computer's move isn't wanted anymore
+        self.computerPlayer.cancel()
+        self.thinking = False
+
+        # the screens are built the first time only, after that we just switch to them
+        if self.stack is None:
+            self.buildScreens(MainWindow)
+        self.stack.setCurrentWidget(self.menuScreen)
+
+    def computerlevel(self, MainWindow):
+        self.stack.setCurrentWidget(self.levelScreen)
+
+    def setupUi(self, MainWindow, friend, level=None):  # Main Window
+        if self.stack is None:
+            self.buildScreens(MainWindow)
+
+        # custumize to play computer or 2 player
+        self.friend = friend
+        if level is not None:
+            self.level = level
+        if self.friend:
+            self.oLabel = 'Player O: '  # only for O because computer is always O
+            self.xWinLabel = 'X won!'
+            self.oWinLabel = 'O won!'
+        else:
+            self.oLabel = 'Computer: '
+            self.xWinLabel = 'Player won!'
+            self.oWinLabel = 'Computer won!'
+
+        if self.friend:
+            self.background_label.setPixmap(assets.pixmap("easy"))
+        else:
+            self.background_label.setPixmap(assets.pixmap("menu"))
+
+        # new match on the same widgets: clear the board and the scores
+        self.computerPlayer.cancel()
+        self.thinking = False
+        self.logGame()
+        self.state = GameState()
+        self.playerX = 0
+        self.PlayerO = 0
+        for button in self.buttons:
+            button.setDisabled(False)
+            button.setText("")
+            self.styles.set(button, 'cell', '')
+        self.winner.setText("")
+        self.styles.set(self.xScore, 'turn', '')
+        self.styles.set(self.oScore, 'turn', '')
+
+        self.retranslateUi(MainWindow)
+        self.addShortcuts()  # setText("") on the cells above dropped their shortcuts
+        self.stack.setCurrentWidget(self.gameScreen)
+        self.refreshAnalysis()
+
+    def buildScreens(self, MainWindow):  # every screen lives in one stacked widget
         # MainWindow
         MainWindow.setObjectName("MainWindow")
         MainWindow.resize(800, 600)
         MainWindow.setFixedSize(800, 600)
-        self.centralwidget = QtWidgets.QWidget(MainWindow)
-        self.centralwidget.setObjectName("centralwidget")
-        
-        background_pixmap = QPixmap("menu.jpg")
 
-        self.background_label = QtWidgets.QLabel(self.centralwidget)
-        self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
-        self.background_label.setPixmap(background_pixmap)
-        self.background_label.setObjectName("background_label")
+        self.stack = QtWidgets.QStackedWidget(MainWindow)
+        self.stack.setObjectName("stack")
+        self.menuScreen = self.buildMenu(MainWindow)
+        self.levelScreen = self.buildLevels(MainWindow)
+        self.gameScreen = self.buildGame(MainWindow)
+        self.stack.addWidget(self.menuScreen)
+        self.stack.addWidget(self.levelScreen)
+        self.stack.addWidget(self.gameScreen)
+
+        # Main Setup
+        MainWindow.setCentralWidget(self.stack)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 404, 22))
+        self.menubar.setObjectName("menubar")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+
+    def buildMenu(self, MainWindow):  # Friend or Computer
+        screen = QtWidgets.QWidget()
+        screen.setObjectName("menuScreen")
+
+        background_label = QtWidgets.QLabel(screen)
+        background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
+        background_label.setPixmap(assets.pixmap("menu"))
+        background_label.setObjectName("background_label")
 
         # Font
         font = QtGui.QFont()
@@ -277,66 +357,47 @@ class Ui_MainWindow(object):
         font.setPointSize(15)
 
         # Friend Button
-        self.friend = QtWidgets.QPushButton(self.centralwidget)
-        self.friend.setGeometry(QtCore.QRect(270, 410, 121, 81))
-        self.friend.setFont(font)
-        self.friend.setText("Friend")
-        self.friend.setObjectName("friend")
-        # this calls another "main" window
-        self.friend.clicked.connect(lambda: self.setupUi(MainWindow, True))
-        
+        self.friendB = QtWidgets.QPushButton(screen)
+        self.friendB.setGeometry(QtCore.QRect(270, 410, 121, 81))
+        self.friendB.setFont(font)
+        self.friendB.setText("Friend")
+        self.friendB.setObjectName("friend")
+        # this shows the game screen
+        self.friendB.clicked.connect(lambda: self.setupUi(MainWindow, True))
+
         # this changes the background color for Friend button
-        self.friend.setStyleSheet("background-color: #A73121; color: white; border-radius: 10px")
+        self.friendB.setStyleSheet("background-color: #A73121; color: white; border-radius: 10px")
 
         # Computer Button
-        self.computer = QtWidgets.QPushButton(self.centralwidget)
-        self.computer.setGeometry(QtCore.QRect(410, 410, 121, 81))
-        self.computer.setFont(font)
-        self.computer.setText("Computer")
-        self.computer.setObjectName("computer")
-        self.computer.clicked.connect(lambda: self.computerlevel(MainWindow))
-        
+        self.computerB = QtWidgets.QPushButton(screen)
+        self.computerB.setGeometry(QtCore.QRect(410, 410, 121, 81))
+        self.computerB.setFont(font)
+        self.computerB.setText("Computer")
+        self.computerB.setObjectName("computer")
+        self.computerB.clicked.connect(lambda: self.computerlevel(MainWindow))
+
         # this changes the background color for Computer button
-        self.computer.setStyleSheet("background-color: #2196F3; color: white;border-radius: 10px")
+        self.computerB.setStyleSheet("background-color: #2196F3; color: white;border-radius: 10px")
 
+        # Add Shortcuts (only the visible screen's shortcuts work)
+        _translate = QtCore.QCoreApplication.translate
+        self.friendB.setShortcut(_translate("MainWindow", "1"))
+        self.computerB.setShortcut(_translate("MainWindow", "2"))
 
-        # Main Setup
-        MainWindow.setCentralWidget(self.centralwidget)
-        self.menubar = QtWidgets.QMenuBar(MainWindow)
-        self.menubar.setGeometry(QtCore.QRect(0, 0, 404, 22))
-        self.menubar.setObjectName("menubar")
-        MainWindow.setMenuBar(self.menubar)
-        self.statusbar = QtWidgets.QStatusBar(MainWindow)
-        self.statusbar.setObjectName("statusbar")
-        MainWindow.setStatusBar(self.statusbar)
+        return screen
 
-        # Add Shortcuts
-        _translate = QtCore.QCoreApplication.translate
-        self.friend.setShortcut(_translate("MainWindow", "1"))
-        self.computer.setShortcut(_translate("MainWindow", "2"))
-        
-        # Load and display the background image
-        
-    
-    def computerlevel(self, MainWindow):
-        
-        # MainWindow
-        MainWindow.setObjectName("MainWindow")
-        MainWindow.resize(800, 600)
-        MainWindow.setFixedSize(800, 600)
-        self.centralwidget = QtWidgets.QWidget(MainWindow)
-        self.centralwidget.setObjectName("centralwidget")
-        
-        background_pixmap = QPixmap("menu.jpg")
+    def buildLevels(self, MainWindow):  # Easy, Medium or Hard
+        screen = QtWidgets.QWidget()
+        screen.setObjectName("levelScreen")
+
+        background_label = QtWidgets.QLabel(screen)
+        background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
+        background_label.setPixmap(assets.pixmap("menu"))
+        background_label.setObjectName("background_label")
 
-        self.background_label = QtWidgets.QLabel(self.centralwidget)
-        self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
-        self.background_label.setPixmap(background_pixmap)
-        self.background_label.setObjectName("background_label")
-        
         # Create a Back button with a picture
-        back_button = QToolButton(self.centralwidget)
-        back_button.setIcon(QIcon("back_icon.jpg"))  # Provide the path to your icon/image
+        back_button = QToolButton(screen)
+        back_button.setIcon(assets.icon("back"))  # decoded once, shared by every screen
         back_button.setIconSize(QSize(100, 100))  # Set the size of the icon
         back_button.setGeometry(10, 10, 100, 100)  # Set the position and size of the button
         back_button.clicked.connect(lambda: self.startup(MainWindow))  # Connect the button click event to a function
@@ -347,199 +408,67 @@ class Ui_MainWindow(object):
         font.setPointSize(14)
 
         # Easy Button
-        self.computer = QtWidgets.QPushButton(self.centralwidget)
-        self.computer.setGeometry(QtCore.QRect(150, 410, 121, 81))
-        self.computer.setFont(font)
-        self.computer.setText("Easy")
-        self.computer.setObjectName("easy")
-        self.level='easy'
+        self.easyB = QtWidgets.QPushButton(screen)
+        self.easyB.setGeometry(QtCore.QRect(150, 410, 121, 81))
+        self.easyB.setFont(font)
+        self.easyB.setText("Easy")
+        self.easyB.setObjectName("easy")
         # this changes the background color for Easy button
-        self.computer.setStyleSheet("background-color: #D2DE32; color: white;border-radius: 10px")
-        
-        # this calls another "main" window
-        self.computer.clicked.connect(lambda: self.setupUi(MainWindow, False))
+        self.easyB.setStyleSheet("background-color: #D2DE32; color: white;border-radius: 10px")
 
-        # Medium Button
-        self.computer = QtWidgets.QPushButton(self.centralwidget)
-        self.computer.setGeometry(QtCore.QRect(350, 410, 121, 81))
-        self.computer.setFont(font)
-        self.computer.setText("Medium")
-        self.computer.setObjectName("medium")
-        self.level='medium'
-        self.computer.clicked.connect(lambda: self.setupUi(MainWindow, False))
-        # this changes the background color for Easy button
-        self.computer.setStyleSheet("background-color: #FF6C22; color: white;border-radius: 10px")
-        
-        # Hard Button
-        self.computer = QtWidgets.QPushButton(self.centralwidget)
-        self.computer.setGeometry(QtCore.QRect(550, 410, 121, 81))
-        self.computer.setFont(font)
-        self.computer.setText("Hard")
-        self.computer.setObjectName("hard")
-        self.level='hard'
-        self.computer.clicked.connect(lambda: self.setupUi(MainWindow, False))
-        # this changes the background color for Easy button
-        self.computer.setStyleSheet("background-color: #D83F31; color: white;border-radius: 10px")
+        # this shows the game screen, each button passes its own level
+        self.easyB.clicked.connect(lambda: self.setupUi(MainWindow, False, 'easy'))
 
+        # Medium Button
+        self.mediumB = QtWidgets.QPushButton(screen)
+        self.mediumB.setGeometry(QtCore.QRect(350, 410, 121, 81))
+        self.mediumB.setFont(font)
+        self.mediumB.setText("Medium")
+        self.mediumB.setObjectName("medium")
+        self.mediumB.clicked.connect(lambda: self.setupUi(MainWindow, False, 'medium'))
+        # this changes the background color for Medium button
+        self.mediumB.setStyleSheet("background-color: #FF6C22; color: white;border-radius: 10px")
 
-        # Main Setup
-        MainWindow.setCentralWidget(self.centralwidget)
-        self.menubar = QtWidgets.QMenuBar(MainWindow)
-        self.menubar.setGeometry(QtCore.QRect(0, 0, 404, 22))
-        self.menubar.setObjectName("menubar")
-        MainWindow.setMenuBar(self.menubar)
-        self.statusbar = QtWidgets.QStatusBar(MainWindow)
-        self.statusbar.setObjectName("statusbar")
-        MainWindow.setStatusBar(self.statusbar)
+        # Hard Button
+        self.hardB = QtWidgets.QPushButton(screen)
+        self.hardB.setGeometry(QtCore.QRect(550, 410, 121, 81))
+        self.hardB.setFont(font)
+        self.hardB.setText("Hard")
+        self.hardB.setObjectName("hard")
+        self.hardB.clicked.connect(lambda: self.setupUi(MainWindow, False, 'hard'))
+        # this changes the background color for Hard button
+        self.hardB.setStyleSheet("background-color: #D83F31; color: white;border-radius: 10px")
 
         # Add Shortcuts
         _translate = QtCore.QCoreApplication.translate
-        self.friend.setShortcut(_translate("MainWindow", "1"))
-        self.computer.setShortcut(_translate("MainWindow", "2"))
-        
-        # Load and display the background image
+        self.easyB.setShortcut(_translate("MainWindow", "1"))
+        self.mediumB.setShortcut(_translate("MainWindow", "2"))
+        self.hardB.setShortcut(_translate("MainWindow", "3"))
 
-    def setupUi(self, MainWindow, friend):  # Main Window
+        return screen
 
-        # MainWindow Settings
-        MainWindow.setObjectName("MainWindow")
-        MainWindow.resize(800, 600)
-        MainWindow.setFixedSize(800, 600)
-        
-        
-        # custumize to play computer or 2 player
-        self.friend = friend
-        if self.friend:
-            self.oLabel = 'Player O: '  # only for O because computer is always O
-            self.xWinLabel = 'X won!'
-            self.oWinLabel = 'O won!'
-        else:
-            self.oLabel = 'Computer: '
-            self.xWinLabel = 'Player won!'
-            self.oWinLabel = 'Computer won!'
-        
-        
-        # Main Grid
-        self.centralwidget = QtWidgets.QWidget(MainWindow)
-        self.centralwidget.setObjectName("centralwidget")
-        
-
-        if self.friend:
-            background_pixmap = QPixmap("easy.bmp")
-        else:
-            background_pixmap = QPixmap("menu.jpg")
+    def buildGame(self, MainWindow):  # the board, reset button and scores
+        screen = QtWidgets.QWidget()
+        screen.setObjectName("gameScreen")
+        self.centralwidget = screen
 
+        # background depends on the mode, setupUi picks it
         self.background_label = QtWidgets.QLabel(self.centralwidget)
         self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
-        self.background_label.setPixmap(background_pixmap)
         self.background_label.setObjectName("background_label")
-        
+
         # Create a Back button with a picture
         back_button = QToolButton(self.centralwidget)
-        back_button.setIcon(QIcon("back_icon.jpg"))  # Provide the path to your icon/image
+        back_button.setIcon(assets.icon("back"))  # decoded once, shared by every screen
         back_button.setIconSize(QSize(300, 300))  # Set the size of the icon
         back_button.setGeometry(10, 10, 85, 85)  # Set the position and size of the button
         back_button.clicked.connect(lambda: self.startup(MainWindow))  # Connect the button click event to a function
 
-        
-        self.gridLayoutWidget = QtWidgets.QWidget(self.centralwidget)
-        self.gridLayoutWidget.setGeometry(QtCore.QRect(230, 150, 310, 290))
-        self.gridLayoutWidget.setObjectName("gridLayoutWidget")
-        self.gridLayout = QtWidgets.QGridLayout(self.gridLayoutWidget)
-        self.gridLayout.setContentsMargins(0, 0, 0, 0)
-        self.gridLayout.setSpacing(10)
-        self.gridLayout.setObjectName("gridLayout")
-        
-
-        # Button 1
-        self.pB1 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB1.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB1.setFont(font)
-        self.pB1.setObjectName("pB1")
-        self.gridLayout.addWidget(self.pB1, 0, 0, 1, 1)
-        self.pB1.clicked.connect(lambda: self.btnClk(1))
-
-        # Button 2
-        self.pB2 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB2.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB2.setFont(font)
-        self.pB2.setObjectName("pB2")
-        self.gridLayout.addWidget(self.pB2, 0, 1, 1, 1)
-        self.pB2.clicked.connect(lambda: self.btnClk(2))
-
-        # Button 3
-        self.pB3 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB3.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB3.setFont(font)
-        self.pB3.setObjectName("pB3")
-        self.gridLayout.addWidget(self.pB3, 0, 2, 1, 1)
-        self.pB3.clicked.connect(lambda: self.btnClk(3))
-
-        # Button 4
-        self.pB4 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB4.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB4.setFont(font)
-        self.pB4.setObjectName("pB4")
-        self.gridLayout.addWidget(self.pB4, 1, 0, 1, 1)
-        self.pB4.clicked.connect(lambda: self.btnClk(4))
-
-        # Button 5
-        self.pB5 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB5.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB5.setFont(font)
-        self.pB5.setObjectName("pB5")
-        self.gridLayout.addWidget(self.pB5, 1, 1, 1, 1)
-        self.pB5.clicked.connect(lambda: self.btnClk(5))
-
-        # Button 6
-        self.pB6 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB6.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB6.setFont(font)
-        self.pB6.setObjectName("pB6")
-        self.gridLayout.addWidget(self.pB6, 1, 2, 1, 1)
-        self.pB6.clicked.connect(lambda: self.btnClk(6))
-
-        # Button 7
-        self.pB7 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB7.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB7.setFont(font)
-        self.pB7.setObjectName("pB7")
-        self.gridLayout.addWidget(self.pB7, 2, 0, 1, 1)
-        self.pB7.clicked.connect(lambda: self.btnClk(7))
-
-        # Button 8
-        self.pB8 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB8.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB8.setFont(font)
-        self.pB8.setObjectName("pB8")
-        self.gridLayout.addWidget(self.pB8, 2, 1, 1, 1)
-        self.pB8.clicked.connect(lambda: self.btnClk(8))
-
-        # Button 9
-        self.pB9 = QtWidgets.QPushButton(self.gridLayoutWidget)
-        self.pB9.setMinimumSize(QtCore.QSize(93, 93))
-        font = QtGui.QFont()
-        font.setPointSize(30)
-        self.pB9.setFont(font)
-        self.pB9.setObjectName("pB9")
-        self.gridLayout.addWidget(self.pB9, 2, 2, 1, 1)
-        self.pB9.clicked.connect(lambda: self.btnClk(9))
+        # the board, one button per cell
+        self.boardWidget = BoardWidget(self.centralwidget, self.state.bits.size)
+        self.boardWidget.setGeometry(QtCore.QRect(230, 150, 310, 290))
+        self.boardWidget.clicked.connect(self.btnClk)
+        self.buttons = self.boardWidget.buttons
 
         # Reset Button
         self.resB = QtWidgets.QPushButton(self.centralwidget)
@@ -554,6 +483,30 @@ class Ui_MainWindow(object):
         self.resB.setObjectName("resB")
         self.resB.clicked.connect(self.gameReset)
     
+        # Undo and Redo Buttons, above Reset
+        self.undoB = QtWidgets.QPushButton(self.centralwidget)
+        self.undoB.setGeometry(QtCore.QRect(630, 320, 101, 61))
+        self.undoB.setFont(font)
+        self.undoB.setStyleSheet("background-color: #2196F3; color: white; border-radius: 10px")
+        self.undoB.setObjectName("undoB")
+        self.undoB.clicked.connect(self.undoMove)
+
+        self.redoB = QtWidgets.QPushButton(self.centralwidget)
+        self.redoB.setGeometry(QtCore.QRect(630, 400, 101, 61))
+        self.redoB.setFont(font)
+        self.redoB.setStyleSheet("background-color: #2196F3; color: white; border-radius: 10px")
+        self.redoB.setObjectName("redoB")
+        self.redoB.clicked.connect(self.redoMove)
+
+        # Analysis toggle, shows what every free cell leads to
+        self.analysisB = QtWidgets.QPushButton(self.centralwidget)
+        self.analysisB.setGeometry(QtCore.QRect(630, 240, 101, 61))
+        self.analysisB.setFont(font)
+        self.analysisB.setCheckable(True)
+        self.analysisB.setStyleSheet("QPushButton { background-color: #2196F3; color: white; border-radius: 10px }"
+                                     "QPushButton:checked { background-color: #0D47A1 }")
+        self.analysisB.setObjectName("analysisB")
+        self.analysisB.toggled.connect(self.refreshAnalysis)
 
         # Winner Text
         self.winner = QtWidgets.QLabel(self.centralwidget)
@@ -575,7 +528,7 @@ class Ui_MainWindow(object):
         font.setPointSize(13)
         self.xScore.setFont(font)
         self.xScore.setObjectName("xScore")
-        self.xScore.setStyleSheet("color: blue")
+        self.xScore.setProperty('turn', '')  # blue until the first move
 
         # O score
         self.oScore = QtWidgets.QLabel(self.centralwidget)
@@ -585,25 +538,11 @@ class Ui_MainWindow(object):
         font.setPointSize(13)
         self.oScore.setFont(font)
         self.oScore.setObjectName("oScore")
-
-        # Others
-        MainWindow.setCentralWidget(self.centralwidget)
-        self.menubar = QtWidgets.QMenuBar(MainWindow)
-        self.menubar.setGeometry(QtCore.QRect(0, 0, 404, 22))
-        self.menubar.setObjectName("menubar")
-        MainWindow.setMenuBar(self.menubar)
-        self.statusbar = QtWidgets.QStatusBar(MainWindow)
-        self.statusbar.setObjectName("statusbar")
-        MainWindow.setStatusBar(self.statusbar)
-
-        self.buttons = [self.pB1, self.pB2, self.pB3, self.pB4,
-                        self.pB5, self.pB6, self.pB7, self.pB8, self.pB9]
+        self.oScore.setProperty('turn', '')
 
         self.addShortcuts()
-        
-        self.retranslateUi(MainWindow)
-        
-    
+
+        return screen
 
     def retranslateUi(self, MainWindow):
         
@@ -611,22 +550,36 @@ class Ui_MainWindow(object):
         MainWindow.setWindowTitle(_translate("MainWindow", "MORPION"))
         self.resB.setText(_translate("MainWindow", "Reset"))
         self.resB.setShortcut(_translate("MainWindow", "Enter"))
+        self.undoB.setText(_translate("MainWindow", "Undo"))
+        self.undoB.setShortcut(_translate("MainWindow", "Ctrl+Z"))
+        self.redoB.setText(_translate("MainWindow", "Redo"))
+        self.redoB.setShortcut(_translate("MainWindow", "Ctrl+Y"))
+        self.analysisB.setText(_translate("MainWindow", "Analysis"))
+        self.analysisB.setShortcut(_translate("MainWindow", "A"))
         self.xScore.setText(_translate("MainWindow", "Player X: 0"))
         self.oScore.setText(_translate("MainWindow", self.oLabel+"0"))
         
 
 
 
-if __name__ == "__main__":
+def main():
     import sys
 
     # Create a Window
     app = QtWidgets.QApplication(sys.argv)
+    assets.preload()  # decode the images once, before the first screen
+    app.setStyleSheet(STYLESHEET)  # cell and score colors, picked by dynamic properties
     MainWindow = QtWidgets.QMainWindow()
     ui = Ui_MainWindow()
+    ui.gameLog = GameLog()  # written on its own thread, the window never waits on it
+    app.aboutToQuit.connect(ui.closeLog)
     ui.startup(MainWindow)
     MainWindow.setWindowTitle("Tic Tac Toe")
     MainWindow.show()  # this shows the startup windows
 
     # To Exit
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
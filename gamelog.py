@@ -0,0 +1,61 @@
+# reads the game log (engine/record.py) a game at a time, so any number of games fit
+#
+#   python gamelog.py                   results, game lengths and openings of games.log
+#   python gamelog.py other.log --show 10      replay the last 10 games move by move
+import argparse
+import collections
+import time
+
+from engine.record import DEFAULT_PATH, readGames, replay
+
+
+def show(moves, starter):
+    marks = (starter, 'O' if starter == 'X' else 'X')
+    board = ['.'] * 9
+    for i, cell in enumerate(moves):
+        board[cell] = marks[i % 2]
+        print(f"{marks[i % 2]} plays {cell + 1}")
+        for row in range(3):
+            print('  ' + ' '.join(board[row * 3:row * 3 + 3]))
+    print(f"result: {replay(moves, starter)[1] or 'unfinished'}\n")
+
+
+def summary(path):
+    started = time.perf_counter()
+    results = collections.Counter()  # (starter, result)
+    lengths = collections.Counter()
+    openings = collections.Counter()  # first two cells
+    games = 0
+    for moves, starter in readGames(path):
+        games += 1
+        results[starter, replay(moves, starter)[1] or 'unfinished'] += 1
+        lengths[len(moves)] += 1
+        openings[tuple(cell + 1 for cell in moves[:2])] += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"{games} games read in {elapsed:.2f} s, {games / elapsed if elapsed else 0:.0f} games/s")
+    if not games:
+        return
+    for starter in 'XO':
+        row = {result: results[starter, result] for result in ('X', 'O', 'Tie', 'unfinished')}
+        total = sum(row.values())
+        if total:
+            print(f"{starter} started {total:>9}: " + '  '.join(f"{r} {100 * n / total:5.1f}%" for r, n in row.items()))
+    print("moves  " + '  '.join(f"{n}: {lengths[n]}" for n in sorted(lengths)))
+    print("openings " + ', '.join(f"{'-'.join(map(str, o))} ({n})" for o, n in openings.most_common(5)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize or replay a game log")
+    parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--show', type=int, default=0, help="replay the last N games instead")
+    args = parser.parse_args()
+    if args.show:
+        for moves, starter in collections.deque(readGames(args.path), maxlen=args.show):
+            show(moves, starter)
+    else:
+        summary(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,109 +1,70 @@
-from PyQt5 import QtCore, QtGui, QtWidgets, QtTest
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QToolButton
 from PyQt5.QtCore import QSize
-import random
+
+import assets
+from styles import STYLESHEET, StyleUpdater
+from engine import Engine, GameState
+from worker import ComputerPlayer
 
 
 class Ui_MainWindow(object):
     def __init__(self):
-        self.playerFlag = 0  # who's turn
-        self.marks = ['O', 'X']
         self.playerX = 0
         self.PlayerO = 0
-        self.winningLineColor = (141, 235, 152)  # color for win line
-        self.drawColor = (163, 163, 163)  # color for a draw
-        self.board = [' ' for _ in range(9)]  # board for minimax algorithm
-
-    def computerMove(self):  # for finding best position
-        bestScore = float('-inf')
-        pos = 0
-        moves = []  # for storing all better moves
-        for i in range(len(self.board)):
-            if self.board[i] == " ":  # if only it is empty
-                self.board[i] = 'O'
-                score = self.minimax(False)
-                # reset it back to empty so it doesn't mess up everything
-                self.board[i] = ' '
-                if bestScore <= score:
-                    bestScore = score
-                    pos = i
-                    moves.append((pos, bestScore))
-
-        # first we pick all moves with bestScore
-        # then we choose random option to make this game more entertaining
-        return random.choice([move for move, score in moves if score == bestScore])
-
-    def minimax(self, isMaximizing):  # function for calculating best possible moves
-        result = self.checkGameOver()
-        if result == 'X':
-            return -1
-        elif result == 'O':
-            return 1
-        elif result == 'Tie':
-            return 0
-
-        # else result == '':
-        if isMaximizing:  # if this is true then it is computer's move
-            bestScore = float('-inf')
-            for i in range(len(self.board)):
-                if self.board[i] == " ":
-                    self.board[i] = 'O'
-                    score = self.minimax(False)
-                    # if we don't reset it back it isn't going to backtrack properly
-                    self.board[i] = ' '
-                    bestScore = max(bestScore, score)
-        else:  # Minimizing
-            bestScore = float('inf')
-            for i in range(len(self.board)):
-                if self.board[i] == " ":
-                    self.board[i] = 'X'
-                    score = self.minimax(True)
-                    self.board[i] = ' '  # same here
-                    bestScore = min(bestScore, score)
-
-        return bestScore  # bestScore can either be 1, -1, 0
+        self.styles = StyleUpdater()  # cell and score colors, re-polished once per batch
+        self.state = GameState()  # board and turns of the game being played
+        self.computerPlayer = ComputerPlayer(delay=700)  # msecs the computer waits before moving
+        self.computerPlayer.moveReady.connect(self.computerMoved)
+        self.thinking = False  # True while the computer is picking its move
+        self.engine = Engine()  # plays from the tablebase, every position solved ahead of time
+
+    @property
+    def board(self):  # list view of the board, one mark per cell
+        return self.state.board
+
+    def computerMove(self, bits=None):  # for finding best position
+        if bits is None:
+            bits = self.state.bits
+        # any of the moves that get the best score
+        # random option to make this game more entertaining
+        return self.engine.computerMove(bits, 'hard')
 
     def btnClk(self, btn):  # On Button Click
+        if self.thinking:  # it's the computer's turn, wait for it
+            return
+
         mark = ''  # current player
 
         # switch between X and O so they are assigned easily
         # we do this so that every new game is started by different player
-        if self.playerFlag == 0:
-            self.marks[0], self.marks[1] = self.marks[1], self.marks[0]
+        if self.state.playerFlag == 0:
+            self.state.swapStarter()
 
         # Check Who's Turn it is
-        if self.playerFlag % 2 == 0:
-            mark = self.marks[0]
-        else:
-            mark = self.marks[1]
+        mark = self.state.turn()
 
         # Change color by player's turn
         if mark == 'X':
-            self.oScore.setStyleSheet(
-                "color: red")
-            self.xScore.setStyleSheet(
-                "color: black")
+            self.styles.set(self.oScore, 'turn', 'next')
+            self.styles.set(self.xScore, 'turn', 'waiting')
         else:
-            self.xScore.setStyleSheet(
-                "color: red")
-            self.oScore.setStyleSheet(
-                "color: black")
+            self.styles.set(self.xScore, 'turn', 'next')
+            self.styles.set(self.oScore, 'turn', 'waiting')
 
         # this condition is handy after reset is called second time in computer game
         # btn == 10 gurantees that it is called from gameReset Function (so we didn't press any button)
         # if it is first move against computer, it's player's move and btn is 10(no button)
-        if not self.playerFlag and mark == 'X' and btn == 10 and not self.friend:
-            # we simply return but before that we have to revert changes we made to self.marks earlier in this function
-            self.marks[0], self.marks[1] = self.marks[1], self.marks[0]
+        if not self.state.playerFlag and mark == 'X' and btn == 10 and not self.friend:
+            # we simply return but before that we have to revert changes we made to the marks earlier in this function
+            self.state.swapStarter()
             return
 
         # not (if we are playing against computer, while is it a first move and mask='O' - it is computer's move)
-        if not(not self.playerFlag and mark == 'O' and not self.friend):
+        if not(not self.state.playerFlag and mark == 'O' and not self.friend):
             self.buttons[btn-1].setText(mark)
             self.buttons[btn-1].setDisabled(True)
-            self.board[btn-1] = mark
-            self.playerFlag += 1
+            self.state.play(btn-1, mark)
 
         # Check if anyone won Everytime Button is Clicked
         result = self.checkGameOver(True)
@@ -112,66 +73,34 @@ class Ui_MainWindow(object):
 
         # after every move Computer is going to do its move here
         elif not self.friend:
-            # make computer wait some time
-            if btn == 10:
-                # reason i have only 1 ms here is that this is the first move computer makes
-                # which takes a lot of time anyway
-                # setting it to 1 makes it automatically go to next frame and then start calculation
-                QtTest.QTest.qWait(1)
-            else:
-                QtTest.QTest.qWait(700)  # msecs
-
-            # set computer's move
-            pos = self.computerMove()
-            self.board[pos] = 'O'
-            button = self.buttons[pos]
-            button.setText("O")
-            button.setDisabled(True)
-            self.playerFlag += 1
-
-            # Chech again after computer made its move
-            result = self.checkGameOver(True)
-            if result != '':  # gameover
-                self.finishGame(result)
+            # make computer wait some time (without blocking the window)
+            # the first move of a game doesn't wait, the player hasn't done anything yet
+            delay = 0 if btn == 10 else self.computerPlayer.delay
+
+            # the computer thinks on a worker thread, on a copy of the board
+            # computerMoved gets its answer
+            self.thinking = True
+            board = self.state.bits.copy()
+            self.computerPlayer.request(lambda: self.computerMove(board), delay)
+
+    def computerMoved(self, pos):  # set computer's move
+        self.thinking = False
+        self.state.play(pos, 'O')
+        button = self.buttons[pos]
+        button.setText("O")
+        button.setDisabled(True)
+
+        # Chech again after computer made its move
+        result = self.checkGameOver(True)
+        if result != '':  # gameover
+            self.finishGame(result)
 
     def checkGameOver(self, color=False):  # Check if Game is Over
-        # color=False - so that when minimax calls it, self.winningLine doesn't change unnecessarily
-        def checkLine(b1, b2, b3):  # reuse and simplify checking
-            if self.board[b1-1] == self.board[b2-1] == self.board[b3-1] and self.board[b1-1] != " ":
-                return True
-            return False
-
-        winner = ''
-
-        # Horizontal Lines
-        for i in range(1, 10, 3):
-            if checkLine(i, i+1, i+2):
-                if color:
-                    self.winningLine = (i, i+1, i+2)
-                return self.board[i-1]
-
-        # Vertical Lines
-        for i in range(1, 4):
-            if checkLine(i, i+3, i+6):
-                if color:
-                    self.winningLine = (i, i+3, i+6)
-                return self.board[i-1]
-
-        # Diagonal Lines
-        if checkLine(1, 5, 9):
-            if color:
-                self.winningLine = (1, 5, 9)
-            return self.board[0]
-        elif checkLine(3, 5, 7):
-            if color:
-                self.winningLine = (3, 5, 7)
-            return self.board[2]
-
-        # Draw
-        elif self.board.count(' ') == 0:
-            return 'Tie'
-
-        return winner  # returns ''
+        # color=True keeps the winning line for finishGame to color
+        result = self.state.checkGameOver()
+        if color and result not in ('', 'Tie'):
+            self.winningLine = self.state.winningLine
+        return result
 
     def finishGame(self, winner):  # takes care of coloring and labeling
         if winner == 'X':  # if X wins
@@ -186,8 +115,7 @@ class Ui_MainWindow(object):
             self.winner.setText("Draw!")
             # Change color If Draw
             for button in self.buttons:
-                button.setStyleSheet(
-                    f"background-color:rgb({str(self.drawColor[0])},{str(self.drawColor[1])},{str(self.drawColor[2])})")
+                self.styles.set(button, 'cell', 'draw')
 
         # disable all the buttons
         for button in self.buttons:
@@ -199,14 +127,17 @@ class Ui_MainWindow(object):
                 self.winningLine[0], self.winningLine[1], self.winningLine[2])
 
     def gameReset(self):  # Start Game Over
+        # forget the move the computer may still be thinking about
+        self.computerPlayer.cancel()
+        self.thinking = False
+
         for button in self.buttons:
             button.setDisabled(False)
             button.setText("")
-            button.setStyleSheet('background-color: None')
-            self.board = [' ' for _ in range(9)]  # reset board
+            self.styles.set(button, 'cell', '')
 
+        self.state.newGame()  # reset board
         self.winner.setText("")
-        self.playerFlag = 0
 
         # to reset shortcuts (idk why)
         self.addShortcuts()
@@ -225,14 +156,13 @@ class Ui_MainWindow(object):
                 "MainWindow", f"{buttonsToKeys[i+1]}"))
 
     def changeColor(self, b1, b2, b3):  # Change Color of a Winning Line
-        self.buttons[b1-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
-        self.buttons[b2-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
-        self.buttons[b3-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
+        for b in (b1, b2, b3):
+            self.styles.set(self.buttons[b-1], 'cell', 'win')
 
     def startup(self, MainWindow):  # first window that shows up
+        # coming back from a game, the computer's move isn't wanted anymore
+        self.computerPlayer.cancel()
+        self.thinking = False
 
         # MainWindow
         MainWindow.setObjectName("MainWindow")
@@ -241,7 +171,7 @@ class Ui_MainWindow(object):
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         
-        background_pixmap = QPixmap("menu.jpg")
+        background_pixmap = assets.pixmap("menu")
 
         self.background_label = QtWidgets.QLabel(self.centralwidget)
         self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
@@ -315,9 +245,9 @@ class Ui_MainWindow(object):
         
 
         if self.friend:
-            background_pixmap = QPixmap("easy.bmp")
+            background_pixmap = assets.pixmap("easy")
         else:
-            background_pixmap = QPixmap("menu.jpg")
+            background_pixmap = assets.pixmap("menu")
 
         self.background_label = QtWidgets.QLabel(self.centralwidget)
         self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
@@ -326,7 +256,7 @@ class Ui_MainWindow(object):
         
         # Create a Back button with a picture
         back_button = QToolButton(self.centralwidget)
-        back_button.setIcon(QIcon("back_icon.jpg"))  # Provide the path to your icon/image
+        back_button.setIcon(assets.icon("back"))  # decoded once, shared by every screen
         back_button.setIconSize(QSize(100, 100))  # Set the size of the icon
         back_button.setGeometry(10, 10, 100, 100)  # Set the position and size of the button
         back_button.clicked.connect(lambda: self.startup(MainWindow))  # Connect the button click event to a function
@@ -459,8 +389,7 @@ class Ui_MainWindow(object):
         font.setPointSize(14)
         self.xScore.setFont(font)
         self.xScore.setObjectName("xScore")
-        self.xScore.setStyleSheet(
-            "color: blue")
+        self.xScore.setProperty('turn', '')  # blue until the first move
 
         # O score
         self.oScore = QtWidgets.QLabel(self.centralwidget)
@@ -470,6 +399,7 @@ class Ui_MainWindow(object):
         font.setPointSize(14)
         self.oScore.setFont(font)
         self.oScore.setObjectName("oScore")
+        self.oScore.setProperty('turn', '')
 
         # Others
         MainWindow.setCentralWidget(self.centralwidget)
@@ -507,6 +437,8 @@ if __name__ == "__main__":
 
     # Create a Window
     app = QtWidgets.QApplication(sys.argv)
+    assets.preload()  # decode the images once, before the first screen
+    app.setStyleSheet(STYLESHEET)  # cell and score colors, picked by dynamic properties
     MainWindow = QtWidgets.QMainWindow()
     ui = Ui_MainWindow()
     ui.startup(MainWindow)
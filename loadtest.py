@@ -0,0 +1,218 @@
+# load test for server.py: many clients playing random moves at the same time
+#
+#   python loadtest.py                       start a server and play 2000 games at once on it
+#   python loadtest.py --games 5000 --rounds 3
+#   python loadtest.py --port 8765           use a server that's already running
+#
+# and for engineservice.py: many clients asking for moves, answered one by one and then in batches
+#
+#   python loadtest.py --service                    200 clients, 100 requests each, hard 3 x 3
+#   python loadtest.py --service --size 7 --level easy --requests 20
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+from timing import percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def serverMemoryKb(pid):  # resident and peak memory from /proc, (None, None) elsewhere
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return None, None
+    return int(fields['VmRSS'].split()[0]), int(fields['VmHWM'].split()[0])
+
+
+class Stats(object):
+    def __init__(self):
+        self.games = 0
+        self.results = {'X': 0, 'O': 0, 'Tie': 0}
+        self.errors = 0
+        self.latencies = []  # seconds from sending a move to the server saying it was played
+
+
+async def client(host, port, rounds, size, stats, rand):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(rounds):
+            writer.write(json.dumps({'op': 'join', 'size': size}).encode() + b'\n')
+            free = set(range(size * size))
+            mark = None
+            sent = 0.0
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                message = json.loads(line)
+                op = message['op']
+                if op == 'start':
+                    mark = message['mark']
+                elif op == 'moved':
+                    free.discard(message['cell'])
+                    if message['mark'] == mark:
+                        stats.latencies.append(time.perf_counter() - sent)
+                elif op == 'over':
+                    if mark == 'X':  # one of the two players counts the game
+                        stats.games += 1
+                        stats.results[message['result']] += 1
+                    break
+                elif op == 'error':
+                    stats.errors += 1
+                    break
+                if message.get('turn') == mark:
+                    sent = time.perf_counter()
+                    writer.write(json.dumps({'op': 'move', 'cell': rand.choice(sorted(free))}).encode() + b'\n')
+    finally:
+        writer.close()
+
+
+async def run(host, port, games, rounds, size, seed):
+    stats = Stats()
+    rand = random.Random(seed)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, rounds, size, stats, rand) for _ in range(2 * games)))
+    return stats, time.perf_counter() - started
+
+
+def spawn(script='server.py', *options):
+    # a server of our own on a free port, returns (process, port)
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, script), '--port', '0', *options],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    found = re.search(r"(\d+)\)", line)
+    if not found:
+        process.kill()
+        raise SystemExit(f"server didn't start: {line!r}")
+    return process, int(found.group(1))
+
+
+def positions(count, size, k, level, rand):
+    # request lines from random games stopped after a random number of moves, so the
+    # openings come up again and again the way they do when people play
+    from engine import Bitboard, Board
+
+    bits = Bitboard() if (size, k) == (3, 3) else Board(size, k)
+    requests = []
+    while len(requests) < count:
+        bits.clear()
+        mark = 'X'
+        for _ in range(rand.randrange(size * size - 1)):
+            bits.play(rand.choice(bits.emptyCells()), mark)
+            mark = 'O' if mark == 'X' else 'X'
+            if bits.result():
+                break
+        if bits.result():
+            continue
+        board = ''.join('.' if bits[cell] == ' ' else bits[cell] for cell in range(size * size))
+        requests.append(f"{board} {level} {mark} {k}")
+    return requests
+
+
+async def ask(host, port, requests, latencies):
+    # one client: a request, wait for the answer, the next one
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        for request in requests:
+            sent = time.perf_counter()
+            writer.write(request.encode() + b'\n')
+            reply = await reader.readline()
+            latencies.append(time.perf_counter() - sent)
+            errors += not reply[:1].isdigit()
+        return errors
+    finally:
+        writer.close()
+
+
+async def serviceStats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'stats\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+async def runService(host, port, workload):
+    latencies = []
+    started = time.perf_counter()
+    errors = await asyncio.gather(*(ask(host, port, requests, latencies) for requests in workload))
+    seconds = time.perf_counter() - started
+    return sum(errors), await serviceStats(host, port), latencies, seconds
+
+
+def loadService(args):
+    k = args.k or min(args.size, 5)
+    rand = random.Random(args.seed)
+    workload = [positions(args.requests, args.size, k, args.level, rand) for _ in range(args.clients)]
+    total = args.clients * args.requests
+    print(f"{args.clients} clients, {args.requests} requests each, {args.level} on {args.size} x {args.size}, "
+          f"{len(set(r for requests in workload for r in requests))} different positions")
+
+    rates = []
+    for name, options in (("one by one", ('--max-batch', '1', '--cache', '0')), ("batched", ())):
+        process, port = spawn('engineservice.py', *options)
+        try:
+            errors, stats, latencies, seconds = asyncio.run(runService(args.host, port, workload))
+        finally:
+            process.kill()
+            process.wait()
+        rates.append(total / seconds)
+        print(f"{name:>10}: {total / seconds:8.0f} requests/s, latency p50 {percentile(latencies, 50) * 1000:.2f} ms  "
+              f"p99 {percentile(latencies, 99) * 1000:.2f} ms, {errors} errors")
+        print(f"{'':>10}  {stats['batches']} batches of {stats['batchSize']}, {stats['solved']} solved, "
+              f"{stats['repeats']} repeats, {stats['cached']} from the cache, queue up to {stats['maxQueue']}")
+    print(f"batching answers {rates[1] / rates[0]:.1f}x as many requests per second")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the network game server or the engine service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="server already running there (default: start one)")
+    parser.add_argument('--games', type=int, default=2000, help="games played at the same time")
+    parser.add_argument('--rounds', type=int, default=1, help="games every pair of clients plays")
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--service', action='store_true', help="load test engineservice.py instead")
+    parser.add_argument('--clients', type=int, default=200, help="--service: clients asking at the same time")
+    parser.add_argument('--requests', type=int, default=100, help="--service: requests per client")
+    parser.add_argument('--level', default='hard', help="--service: level asked for")
+    parser.add_argument('--k', type=int, default=None, help="--service: marks in a row to win")
+    args = parser.parse_args()
+    if args.service:
+        loadService(args)
+        return
+
+    process = None
+    port = args.port
+    if port is None:
+        process, port = spawn()
+    try:
+        idle = serverMemoryKb(process.pid) if process else (None, None)
+        stats, seconds = asyncio.run(run(args.host, port, args.games, args.rounds, args.size, args.seed))
+        _, peak = serverMemoryKb(process.pid) if process else (None, None)
+    finally:
+        if process:
+            process.kill()
+            process.wait()
+
+    print(f"{stats.games} games ({args.games} at a time) in {seconds:.2f} s, {stats.games / seconds:.0f} games/s, "
+          f"{len(stats.latencies) / seconds:.0f} moves/s")
+    print(f"results {stats.results}, {stats.errors} errors")
+    print(f"move latency p50 {percentile(stats.latencies, 50) * 1000:.2f} ms  "
+          f"p99 {percentile(stats.latencies, 99) * 1000:.2f} ms  max {max(stats.latencies, default=0) * 1000:.2f} ms")
+    if peak is not None:
+        print(f"server memory: {idle[0]} kB idle, {peak} kB peak, "
+              f"{(peak - idle[0]) / args.games:.1f} kB per match (both connections included)")
+
+
+if __name__ == "__main__":
+    main()
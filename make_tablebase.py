@@ -0,0 +1,10 @@
+# solves every position and writes tablebase.bin (the game does this by itself if the file is missing)
+import sys
+
+from engine.tablebase import DEFAULT_PATH, generate
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    count = generate(path)
+    print(f"{count} positions written to {path}")
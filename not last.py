@@ -1,129 +1,69 @@
-from PyQt5 import QtCore, QtGui, QtWidgets, QtTest
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QToolButton
 from PyQt5.QtCore import QSize
-import random
+
+import assets
+from styles import STYLESHEET, StyleUpdater
+from engine import Engine, GameState, PerfectMove, RandomMove
+from engine.trace import traced
+
+
+@traced('wait', 'wait')
+def wait(msecs):  # what QtTest's qWait does, without importing QtTest for it
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(msecs, loop.quit)
+    loop.exec_()
 
 
 class Ui_MainWindow(object):
     def __init__(self):
-        self.playerFlag = 0  # who's turn
-        self.marks = ['O', 'X']
         self.playerX = 0
         self.PlayerO = 0
-        self.winningLineColor = (141, 235, 152)  # color for win line
-        self.drawColor = (163, 163, 163)  # color for a draw
-        self.board = [' ' for _ in range(9)]  # board for minimax algorithm
+        self.styles = StyleUpdater()  # cell and score colors, re-polished once per batch
+        self.state = GameState()  # board and turns of the game being played
+        # this window's minimax never stopped at the depth it was given,
+        # so medium and hard both play perfectly
+        self.engine = Engine(levels={'easy': RandomMove(), 'medium': PerfectMove(), 'hard': PerfectMove()})
+
+    @property
+    def board(self):  # list view of the board, one mark per cell
+        return self.state.board
 
     def computerMove(self, level):
-        if level == "easy":
-            return self.easyMove()
-        elif level == "medium":
-            return self.mediumMove()
-        elif level == "hard":
-            return self.hardMove()
-        else:
-            raise ValueError("Invalid level. Choose from 'easy', 'medium', or 'hard'.")
-
-    def easyMove(self):
-        # Implement your easy-level strategy here
-        # For example, return a random empty position
-        empty_positions = [i for i in range(len(self.board)) if self.board[i] == " "]
-        return random.choice(empty_positions)
-
-    def mediumMove(self):
-        # Implement your medium-level strategy here
-        # For example, use minimax with a limited depth
-        return self.minimaxMove(depth=2)
-
-    def hardMove(self):
-        # Implement your hard-level strategy here
-        # For example, use minimax with a deeper search
-        return self.minimaxMove(depth=4)
-
-    def minimaxMove(self, depth):
-        bestScore = float('-inf')
-        pos = 0
-        for i in range(len(self.board)):
-            if self.board[i] == " ":
-                self.board[i] = 'O'
-                score = self.minimax(False, depth)
-                self.board[i] = ' '
-                if bestScore <= score:
-                    bestScore = score
-                    pos = i
-        return pos
-
-    def minimax(self, isMaximizing, depth):  # function for calculating best possible moves
-        result = self.checkGameOver()
-        if result == 'X':
-            return -1
-        elif result == 'O':
-            return 1
-        elif result == 'Tie':
-            return 0
-
-        # else result == '':
-        if isMaximizing:  # if this is true then it is computer's move
-            bestScore = float('-inf')
-            for i in range(len(self.board)):
-                if self.board[i] == " ":
-                    self.board[i] = 'O'
-                    score = self.minimax(False, depth-1)
-                    # if we don't reset it back it isn't going to backtrack properly
-                    self.board[i] = ' '
-                    bestScore = max(bestScore, score)
-        else:  # Minimizing
-            bestScore = float('inf')
-            for i in range(len(self.board)):
-                if self.board[i] == " ":
-                    self.board[i] = 'X'
-                    score = self.minimax(True, depth-1)
-                    self.board[i] = ' '  # same here
-                    bestScore = min(bestScore, score)
-
-        return bestScore  # bestScore can either be 1, -1, 0
+        return self.engine.computerMove(self.state.bits, level)
 
     def btnClk(self, btn):  # On Button Click
         mark = ''  # current player
 
         # switch between X and O so they are assigned easily
         # we do this so that every new game is started by different player
-        if self.playerFlag == 0:
-            self.marks[0], self.marks[1] = self.marks[1], self.marks[0]
+        if self.state.playerFlag == 0:
+            self.state.swapStarter()
 
         # Check Who's Turn it is
-        if self.playerFlag % 2 == 0:
-            mark = self.marks[0]
-        else:
-            mark = self.marks[1]
+        mark = self.state.turn()
 
         # Change color by player's turn
         if mark == 'X':
-            self.oScore.setStyleSheet(
-                "color: red")
-            self.xScore.setStyleSheet(
-                "color: black")
+            self.styles.set(self.oScore, 'turn', 'next')
+            self.styles.set(self.xScore, 'turn', 'waiting')
         else:
-            self.xScore.setStyleSheet(
-                "color: red")
-            self.oScore.setStyleSheet(
-                "color: black")
+            self.styles.set(self.xScore, 'turn', 'next')
+            self.styles.set(self.oScore, 'turn', 'waiting')
 
         # this condition is handy after reset is called second time in computer game
         # btn == 10 gurantees that it is called from gameReset Function (so we didn't press any button)
         # if it is first move against computer, it's player's move and btn is 10(no button)
-        if not self.playerFlag and mark == 'X' and btn == 10 and not self.friend:
-            # we simply return but before that we have to revert changes we made to self.marks earlier in this function
-            self.marks[0], self.marks[1] = self.marks[1], self.marks[0]
+        if not self.state.playerFlag and mark == 'X' and btn == 10 and not self.friend:
+            # we simply return but before that we have to revert changes we made to the marks earlier in this function
+            self.state.swapStarter()
             return
 
         # not (if we are playing against computer, while is it a first move and mask='O' - it is computer's move)
-        if not(not self.playerFlag and mark == 'O' and not self.friend):
+        if not(not self.state.playerFlag and mark == 'O' and not self.friend):
             self.buttons[btn-1].setText(mark)
             self.buttons[btn-1].setDisabled(True)
-            self.board[btn-1] = mark
-            self.playerFlag += 1
+            self.state.play(btn-1, mark)
 
         # Check if anyone won Everytime Button is Clicked
         result = self.checkGameOver(True)
@@ -137,17 +77,16 @@ class Ui_MainWindow(object):
                 # reason i have only 1 ms here is that this is the first move computer makes
                 # which takes a lot of time anyway
                 # setting it to 1 makes it automatically go to next frame and then start calculation
-                QtTest.QTest.qWait(1)
+                wait(1)
             else:
-                QtTest.QTest.qWait(700)  # msecs
+                wait(700)  # msecs
 
             # set computer's move
             pos = self.computerMove(self.level)
-            self.board[pos] = 'O'
+            self.state.play(pos, 'O')
             button = self.buttons[pos]
             button.setText("O")
             button.setDisabled(True)
-            self.playerFlag += 1
 
             # Chech again after computer made its move
             result = self.checkGameOver(True)
@@ -155,43 +94,11 @@ class Ui_MainWindow(object):
                 self.finishGame(result)
 
     def checkGameOver(self, color=False):  # Check if Game is Over
-        # color=False - so that when minimax calls it, self.winningLine doesn't change unnecessarily
-        def checkLine(b1, b2, b3):  # reuse and simplify checking
-            if self.board[b1-1] == self.board[b2-1] == self.board[b3-1] and self.board[b1-1] != " ":
-                return True
-            return False
-
-        winner = ''
-
-        # Horizontal Lines
-        for i in range(1, 10, 3):
-            if checkLine(i, i+1, i+2):
-                if color:
-                    self.winningLine = (i, i+1, i+2)
-                return self.board[i-1]
-
-        # Vertical Lines
-        for i in range(1, 4):
-            if checkLine(i, i+3, i+6):
-                if color:
-                    self.winningLine = (i, i+3, i+6)
-                return self.board[i-1]
-
-        # Diagonal Lines
-        if checkLine(1, 5, 9):
-            if color:
-                self.winningLine = (1, 5, 9)
-            return self.board[0]
-        elif checkLine(3, 5, 7):
-            if color:
-                self.winningLine = (3, 5, 7)
-            return self.board[2]
-
-        # Draw
-        elif self.board.count(' ') == 0:
-            return 'Tie'
-
-        return winner  # returns ''
+        # color=True keeps the winning line for finishGame to color
+        result = self.state.checkGameOver()
+        if color and result not in ('', 'Tie'):
+            self.winningLine = self.state.winningLine
+        return result
 
     def finishGame(self, winner):  # takes care of coloring and labeling
         if winner == 'X':  # if X wins
@@ -206,8 +113,7 @@ class Ui_MainWindow(object):
             self.winner.setText("Draw!")
             # Change color If Draw
             for button in self.buttons:
-                button.setStyleSheet(
-                    f"background-color:rgb({str(self.drawColor[0])},{str(self.drawColor[1])},{str(self.drawColor[2])})")
+                self.styles.set(button, 'cell', 'draw')
 
         # disable all the buttons
         for button in self.buttons:
@@ -222,11 +128,10 @@ class Ui_MainWindow(object):
         for button in self.buttons:
             button.setDisabled(False)
             button.setText("")
-            button.setStyleSheet('background-color: None')
-            self.board = [' ' for _ in range(9)]  # reset board
+            self.styles.set(button, 'cell', '')
 
+        self.state.newGame()  # reset board
         self.winner.setText("")
-        self.playerFlag = 0
 
         # to reset shortcuts (idk why)
         self.addShortcuts()
@@ -245,12 +150,8 @@ class Ui_MainWindow(object):
                 "MainWindow", f"{buttonsToKeys[i+1]}"))
 
     def changeColor(self, b1, b2, b3):  # Change Color of a Winning Line
-        self.buttons[b1-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
-        self.buttons[b2-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
-        self.buttons[b3-1].setStyleSheet(
-            f"background-color:rgb({str(self.winningLineColor[0])},{str(self.winningLineColor[1])},{str(self.winningLineColor[2])})")
+        for b in (b1, b2, b3):
+            self.styles.set(self.buttons[b-1], 'cell', 'win')
 
     def startup(self, MainWindow):  # first window that shows up
 
@@ -261,7 +162,7 @@ class Ui_MainWindow(object):
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         
-        background_pixmap = QPixmap("menu.jpg")
+        background_pixmap = assets.pixmap("menu")
 
         self.background_label = QtWidgets.QLabel(self.centralwidget)
         self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
@@ -317,7 +218,7 @@ class Ui_MainWindow(object):
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         
-        background_pixmap = QPixmap("menu.jpg")
+        background_pixmap = assets.pixmap("menu")
 
         self.background_label = QtWidgets.QLabel(self.centralwidget)
         self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
@@ -401,9 +302,9 @@ class Ui_MainWindow(object):
         
 
         if self.friend:
-            background_pixmap = QPixmap("easy.bmp")
+            background_pixmap = assets.pixmap("easy")
         else:
-            background_pixmap = QPixmap("menu.jpg")
+            background_pixmap = assets.pixmap("menu")
 
         self.background_label = QtWidgets.QLabel(self.centralwidget)
         self.background_label.setGeometry(QtCore.QRect(0, 0, 800, 600))  # Adjust the dimensions as needed
@@ -412,7 +313,7 @@ class Ui_MainWindow(object):
         
         # Create a Back button with a picture
         back_button = QToolButton(self.centralwidget)
-        back_button.setIcon(QIcon("back_icon.jpg"))  # Provide the path to your icon/image
+        back_button.setIcon(assets.icon("back"))  # decoded once, shared by every screen
         back_button.setIconSize(QSize(100, 100))  # Set the size of the icon
         back_button.setGeometry(10, 10, 100, 100)  # Set the position and size of the button
         back_button.clicked.connect(lambda: self.startup(MainWindow))  # Connect the button click event to a function
@@ -545,8 +446,7 @@ class Ui_MainWindow(object):
         font.setPointSize(14)
         self.xScore.setFont(font)
         self.xScore.setObjectName("xScore")
-        self.xScore.setStyleSheet(
-            "color: blue")
+        self.xScore.setProperty('turn', '')  # blue until the first move
 
         # O score
         self.oScore = QtWidgets.QLabel(self.centralwidget)
@@ -556,6 +456,7 @@ class Ui_MainWindow(object):
         font.setPointSize(14)
         self.oScore.setFont(font)
         self.oScore.setObjectName("oScore")
+        self.oScore.setProperty('turn', '')
 
         # Others
         MainWindow.setCentralWidget(self.centralwidget)
@@ -593,6 +494,8 @@ if __name__ == "__main__":
 
     # Create a Window
     app = QtWidgets.QApplication(sys.argv)
+    assets.preload()  # decode the images once, before the first screen
+    app.setStyleSheet(STYLESHEET)  # cell and score colors, picked by dynamic properties
     MainWindow = QtWidgets.QMainWindow()
     ui = Ui_MainWindow()
     ui.startup(MainWindow)
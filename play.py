@@ -0,0 +1,164 @@
+# starts the game: the window, a game in the terminal, or the bare engine
+#
+#   python play.py                       the window (needs PyQt5)
+#   python play.py --cli                 play against the computer in the terminal
+#   python play.py --cli --friend        two players in the terminal
+#   python play.py --engine              read positions on stdin, answer moves on stdout
+#   python play.py --trace trace.json    any mode, timed and saved as a Chrome trace (engine/trace.py)
+#
+# only the window imports Qt, the other modes start without it (and without a display)
+import argparse
+import os
+import sys
+
+EMPTY = '.-_'  # what counts as an empty cell in --engine positions
+
+
+def show(bits, out):  # marks, and the cell numbers to type for the empty ones
+    size = bits.size
+    width = len(str(size * size))
+    for row in range(size):
+        cells = []
+        for col in range(size):
+            cell = row * size + col
+            mark = bits[cell]
+            cells.append((mark if mark != ' ' else str(cell + 1)).rjust(width))
+        print(' '.join(cells), file=out)
+
+
+def askMove(state, mark, inp, out):  # cell (from 0) the player typed, None to quit
+    while True:
+        print(f"{mark} to play (1-{state.bits.size ** 2}, q to quit): ", end='', file=out, flush=True)
+        line = inp.readline()
+        if not line or line.strip().lower() == 'q':
+            return None
+        try:
+            cell = int(line) - 1
+        except ValueError:
+            print("type a cell number", file=out)
+            continue
+        if 0 <= cell < state.bits.size ** 2 and state.bits[cell] == ' ':
+            return cell
+        print("that cell isn't free", file=out)
+
+
+def playTerminal(level='hard', friend=False, size=3, k=3, inp=sys.stdin, out=sys.stdout):
+    from engine import Engine, GameState
+
+    state = GameState(size, k)
+    engine = None if friend else Engine()
+    while True:
+        # every new game is started by different player, X first
+        state.swapStarter()
+        result = ''
+        while result == '':
+            show(state.bits, out)
+            mark = state.turn()
+            if friend or mark == 'X':
+                cell = askMove(state, mark, inp, out)
+                if cell is None:
+                    return
+            else:
+                cell = engine.computerMove(state.bits, level, mark)
+                print(f"computer plays {cell + 1}", file=out)
+            state.play(cell, mark)
+            result = state.checkGameOver()
+
+        show(state.bits, out)
+        if result == 'Tie':
+            print("Draw!", file=out)
+        elif friend:
+            print(f"{result} won!", file=out)
+        else:
+            print("Player won!" if result == 'X' else "Computer won!", file=out)
+
+        print("play again? [y/N] ", end='', file=out, flush=True)
+        if inp.readline().strip().lower() != 'y':
+            return
+        state.newGame()
+
+
+def parsePosition(text, k=None, mark=None):
+    # 'X.O......' -> GameState with those marks, cells by row; the size comes from the length
+    # mark, if it's given, has to be the side to move
+    from engine import GameState
+
+    size = int(len(text) ** 0.5)
+    if size * size != len(text):
+        raise ValueError(f"{len(text)} cells isn't a square board")
+    state = GameState(size, k or min(size, 5))
+    for cell, c in enumerate(text.upper()):
+        if c in 'XO':
+            state.play(cell, c)
+        elif c not in EMPTY:
+            raise ValueError(f"unknown mark {c!r}")
+    if state.checkGameOver():
+        raise ValueError("the game is over")
+    x, o = text.upper().count('X'), text.upper().count('O')
+    if abs(x - o) > 1:
+        raise ValueError(f"{x} X and {o} O can't happen in a game")
+    if mark is not None:
+        if mark not in ('X', 'O'):
+            raise ValueError(f"unknown mark {mark!r}, X or O")
+        if (mark == 'X' and x > o) or (mark == 'O' and o > x):
+            raise ValueError(f"{'O' if mark == 'X' else 'X'} is to move, not {mark}")
+    return state
+
+
+def answer(engine, words):
+    # one request, split in words: board [level] [mark] [k] -> the cell to play (from 1) or an error
+    try:
+        board = words[0].upper()
+        # without a mark, whoever has fewer marks moves (O if they have as many)
+        mark = words[2].upper() if len(words) > 2 else 'X' if board.count('O') > board.count('X') else 'O'
+        state = parsePosition(board, int(words[3]) if len(words) > 3 else None, mark)
+        level = words[1] if len(words) > 1 else 'hard'
+        cell = engine.computerMove(state.bits, level, mark)
+    except ValueError as e:
+        return f"error: {e}"
+    return str(cell + 1)
+
+
+def serveEngine(inp=sys.stdin, out=sys.stdout):
+    # one position per line, answered as soon as it's read (engineservice.py does it over a socket)
+    from engine import Engine
+
+    engine = Engine()
+    for line in inp:
+        words = line.split()
+        if words:
+            print(answer(engine, words), file=out, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tic tac toe")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--cli', action='store_true', help="play in the terminal")
+    mode.add_argument('--engine', action='store_true', help="answer positions from stdin, no board shown")
+    parser.add_argument('--friend', action='store_true', help="two players instead of the computer (--cli)")
+    parser.add_argument('--level', default='hard', choices=('easy', 'medium', 'hard'), help="computer level (--cli)")
+    parser.add_argument('--size', type=int, default=3, help="board size (--cli)")
+    parser.add_argument('--k', type=int, default=None, help="marks in a row to win (--cli)")
+    parser.add_argument('--trace', metavar='FILE', help="save a Chrome trace of where the time goes")
+    args = parser.parse_args(argv)
+    if args.trace:  # read when engine.trace is first imported, which hasn't happened yet
+        os.environ['TICTACTOE_TRACE'] = args.trace
+
+    if args.cli:  # the window is 3 x 3, and --engine positions give their own size
+        from engine.board import geometry
+        try:
+            geometry(args.size, args.k or min(args.size, 5))
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.engine:
+        serveEngine()
+    elif args.cli:
+        playTerminal(args.level, args.friend, args.size, args.k or min(args.size, 5))
+    else:
+        import game  # pulls in PyQt5
+        game.main()
+
+
+if __name__ == "__main__":
+    main()
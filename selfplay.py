@@ -0,0 +1,140 @@
+# plays the computer levels against each other (and a random player) on every core
+#
+#   python selfplay.py                               every pair of levels, 100000 games each
+#   python selfplay.py --players hard,random --games 1000000
+#   python selfplay.py --size 7 --k 4 --players easy,medium --games 200
+#   python selfplay.py --log games.log            also append every 3 x 3 game to a game log
+#
+# each worker process keeps one engine (and its caches) for all its games, and sends back
+# counts only (and a shard's records, with --log), so memory stays flat however many games are played
+import argparse
+import itertools
+import multiprocessing
+import random
+import time
+
+from engine import GRID_LEVELS, LEVELS, Bitboard, Board, Engine, RandomMove, Tablebase
+from engine.record import GameLog, encode
+
+PLAYERS = ('easy', 'medium', 'hard', 'random')
+
+_engine = None  # the worker's engine
+
+
+def startWorker():
+    global _engine
+    # 'random' is the baseline: any free cell, on every board size
+    _engine = Engine(levels=dict(LEVELS, random=RandomMove()), gridLevels=dict(GRID_LEVELS, random=RandomMove()))
+
+
+def playGames(task):
+    # one shard of a matchup -> (a, b, [a wins, b wins, draws, moves], game records or b'')
+    a, b, games, seed, size, k, log = task
+    random.seed(seed)
+    bits = Bitboard() if (size, k) == (3, 3) else Board(size, k)
+    counts = [0, 0, 0, 0]
+    records = []
+    for game in range(games):
+        bits.clear()
+        # a and b take turns starting, whoever starts plays X
+        aStarts = game % 2 == 0
+        players = {'X': a, 'O': b} if aStarts else {'X': b, 'O': a}
+        mark = 'X'
+        result = ''
+        moves = []
+        while result == '':
+            cell = _engine.computerMove(bits, players[mark], mark)
+            bits.play(cell, mark)
+            moves.append(cell)
+            result = bits.result()
+            mark = 'O' if mark == 'X' else 'X'
+        counts[3] += len(moves)
+        if log:
+            records.append(encode(moves))
+        if result == 'Tie':
+            counts[2] += 1
+        elif (result == 'X') == aStarts:
+            counts[0] += 1
+        else:
+            counts[1] += 1
+    return a, b, counts, b''.join(records)
+
+
+def tasks(matchups, games, chunk, seed, size, k, log):
+    # shards are made as the pool asks for them, never all at once
+    n = 0
+    for a, b in matchups:
+        for start in range(0, games, chunk):
+            yield a, b, min(chunk, games - start), seed * 1000003 + n, size, k, log
+            n += 1
+
+
+def report(stats, started):
+    elapsed = time.perf_counter() - started
+    total = sum(c[0] + c[1] + c[2] for c in stats.values())
+    print(f"\n{total} games in {elapsed:.1f} s, {total / elapsed if elapsed else 0:.0f} games/s")
+    print(f"{'':<18} {'wins':>9} {'losses':>9} {'draws':>9} {'win %':>7} {'draw %':>7} {'moves':>6}")
+    for (a, b), (aw, bw, draws, moves) in stats.items():
+        games = aw + bw + draws
+        if not games:
+            continue
+        print(f"{a + ' v ' + b:<18} {aw:>9} {bw:>9} {draws:>9} {100 * aw / games:>6.2f}% "
+              f"{100 * draws / games:>6.2f}% {moves / games:>6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play the computer levels against each other")
+    parser.add_argument('--players', default=','.join(PLAYERS), help="levels to pair up, comma separated")
+    parser.add_argument('--games', type=int, default=100000, help="games per pair")
+    parser.add_argument('--chunk', type=int, default=1000, help="games a worker plays before reporting")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(), help="processes")
+    parser.add_argument('--size', type=int, default=3, help="board size")
+    parser.add_argument('--k', type=int, default=None, help="marks in a row to win")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--every', type=float, default=2.0, help="seconds between progress lines")
+    parser.add_argument('--log', help="game log to append every game to (3 x 3 only)")
+    args = parser.parse_args()
+
+    players = args.players.split(',')
+    for player in players:
+        if player not in PLAYERS:
+            parser.error(f"unknown player {player!r}, choose from {', '.join(PLAYERS)}")
+    k = args.k or min(args.size, 5)
+    matchups = list(itertools.combinations(players, 2)) if len(players) > 1 else [(players[0], players[0])]
+    if (args.size, k) == (3, 3):
+        Tablebase.load().close()  # make sure the file exists before the workers all look for it
+    elif args.log:
+        parser.error("--log records 3 x 3 games only")
+    log = GameLog(args.log) if args.log else None
+
+    stats = {matchup: [0, 0, 0, 0] for matchup in matchups}
+    total = len(matchups) * args.games
+    done = 0
+    started = last = time.perf_counter()
+    pool = multiprocessing.Pool(args.workers, initializer=startWorker)
+    try:
+        for a, b, counts, records in pool.imap_unordered(playGames, tasks(matchups, args.games, args.chunk,
+                                                                           args.seed, args.size, k, bool(log))):
+            if log:
+                log.appendRecords(records)
+            row = stats[a, b]
+            for i, n in enumerate(counts):
+                row[i] += n
+            done += counts[0] + counts[1] + counts[2]
+            now = time.perf_counter()
+            if now - last >= args.every:
+                last = now
+                print(f"{done}/{total} games, {done / (now - started):.0f} games/s", flush=True)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print("\nstopped, results so far:")
+    finally:
+        pool.join()
+        if log:
+            log.close()
+    report(stats, started)
+
+
+if __name__ == "__main__":
+    main()
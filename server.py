@@ -0,0 +1,184 @@
+# network games for the Friend mode: one asyncio process hosts any number of matches
+#
+#   python server.py                     listen on 127.0.0.1:8765
+#   python server.py --port 9000
+#
+# one JSON object per line, both ways (cells numbered from 0, by row):
+#   -> {"op": "join"}                    wait for an opponent, "size" and "k" for bigger boards
+#   <- {"op": "start", "match": 7, "mark": "X", "turn": "X", "size": 3, "k": 3}
+#   -> {"op": "move", "cell": 4}
+#   <- {"op": "moved", "mark": "X", "cell": 4, "turn": "O"}     to both players, no turn once it's over
+#   <- {"op": "over", "result": "X", "line": [0, 4, 8]}         result 'X', 'O' or 'Tie'
+#   <- {"op": "error", "error": "not your turn"}
+# a player who leaves a match loses it, and can send join again after a match is over
+import argparse
+import asyncio
+import json
+
+from engine import GameState
+
+MAX_LINE = 256  # bytes, anything longer isn't a message of ours
+
+
+def encode(message):
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+
+class Player(object):
+    __slots__ = ('writer', 'match', 'mark')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.match = None
+        self.mark = None
+
+    def send(self, message):
+        self.writer.write(encode(message))
+
+
+class Match(object):
+    __slots__ = ('id', 'state', 'players')
+
+    def __init__(self, id, state, x, o):
+        self.id = id
+        self.state = state
+        self.players = (x, o)  # X moves first
+
+
+class Server(object):
+    def __init__(self):
+        self.waiting = {}  # (size, k) -> player waiting for an opponent
+        self.nextId = 1
+        self.matches = 0  # being played right now
+        self.finished = 0
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        player = Player(writer)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than MAX_LINE
+                    player.send({'op': 'error', 'error': "message too long"})
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    op = message['op']
+                except (ValueError, KeyError, TypeError):
+                    player.send({'op': 'error', 'error': "not a message"})
+                else:
+                    if op == 'join':
+                        self.join(player, message)
+                    elif op == 'move':
+                        self.move(player, message)
+                    else:
+                        player.send({'op': 'error', 'error': f"unknown op {op!r}"})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            self.leave(player)
+            writer.close()
+
+    def join(self, player, message):
+        if player.match is not None or player in self.waiting.values():
+            player.send({'op': 'error', 'error': "already in a match"})
+            return
+        size = message.get('size', 3)
+        k = message.get('k', min(size, 5) if type(size) is int else 3)
+        try:
+            state = GameState(size, k)
+        except (ValueError, TypeError) as e:
+            player.send({'op': 'error', 'error': str(e)})
+            return
+
+        other = self.waiting.pop((size, k), None)
+        if other is None:
+            self.waiting[size, k] = player
+            return
+
+        # whoever waited plays X
+        state.swapStarter()
+        match = Match(self.nextId, state, other, player)
+        self.nextId += 1
+        self.matches += 1
+        for p, mark in zip(match.players, 'XO'):
+            p.match = match
+            p.mark = mark
+            p.send({'op': 'start', 'match': match.id, 'mark': mark, 'turn': 'X', 'size': size, 'k': k})
+
+    def move(self, player, message):
+        match = player.match
+        if match is None:
+            player.send({'op': 'error', 'error': "not in a match"})
+            return
+        state = match.state
+        if state.turn() != player.mark:
+            player.send({'op': 'error', 'error': "not your turn"})
+            return
+        cell = message.get('cell')
+        if type(cell) is not int or not 0 <= cell < state.bits.size ** 2 or state.bits[cell] != ' ':
+            player.send({'op': 'error', 'error': "that cell isn't free"})
+            return
+
+        state.play(cell, player.mark)
+        result = state.checkGameOver()
+        moved = {'op': 'moved', 'mark': player.mark, 'cell': cell}
+        if not result:
+            moved['turn'] = state.turn()
+        self.broadcast(match, moved)
+        if result:
+            over = {'op': 'over', 'result': result}
+            if result != 'Tie':
+                over['line'] = [c - 1 for c in state.winningLine]  # winningLine counts from 1
+            self.broadcast(match, over)
+            self.end(match)
+
+    def leave(self, player):
+        for key, waiting in list(self.waiting.items()):
+            if waiting is player:
+                del self.waiting[key]
+        match = player.match
+        if match is not None:
+            for other in match.players:
+                if other is not player:
+                    other.send({'op': 'over', 'result': other.mark, 'left': True})
+            self.end(match)
+
+    def broadcast(self, match, message):
+        data = encode(message)
+        for p in match.players:
+            p.writer.write(data)
+
+    def end(self, match):
+        for p in match.players:
+            p.match = None
+            p.mark = None
+        self.matches -= 1
+        self.finished += 1
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        print(f"listening on {', '.join(str(s.getsockname()[:2]) for s in server.sockets)}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic tac toe server for network games")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help="0 picks a free one")
+    args = parser.parse_args()
+    try:
+        asyncio.run(Server().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# one stylesheet for the whole app, widgets change look through dynamic properties
+from PyQt5 import QtCore
+
+from engine.trace import traced
+
+WIN_COLOR = (141, 235, 152)  # color for win line
+DRAW_COLOR = (163, 163, 163)  # color for a draw
+
+# cell: '' (normal), 'win' or 'draw'
+# turn: '' (before the first move), 'next' (plays next) or 'waiting'
+# hint: '' (no analysis), 'win', 'draw' or 'loss' for what a free cell leads to
+STYLESHEET = f"""
+QPushButton[cell="win"] {{ background-color: rgb{WIN_COLOR}; }}
+QPushButton[cell="draw"] {{ background-color: rgb{DRAW_COLOR}; }}
+QPushButton[hint="win"] {{ color: green; font-size: 12pt; }}
+QPushButton[hint="draw"] {{ color: gray; font-size: 12pt; }}
+QPushButton[hint="loss"] {{ color: red; font-size: 12pt; }}
+QLabel#xScore[turn=""] {{ color: blue; }}
+QLabel[turn="next"] {{ color: red; }}
+QLabel[turn="waiting"] {{ color: black; }}
+"""
+
+
+class StyleUpdater(QtCore.QObject):
+    # setStyleSheet re-polishes a widget on every call, so property changes are collected
+    # and every changed widget is re-polished once, before the next paint
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = {}  # widgets to re-polish, in the order they changed
+        self.flushed = 0  # widgets the last flush re-polished
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)  # runs once the current event is handled
+        self.timer.timeout.connect(self.flush)
+
+    def set(self, widget, name, value):
+        if (widget.property(name) or '') == value:
+            return
+        widget.setProperty(name, value)
+        self.pending[widget] = None
+        if not self.timer.isActive():
+            self.timer.start()
+
+    @traced('restyle', 'render', lambda updater: {'widgets': updater.flushed})
+    def flush(self):
+        widgets, self.pending = self.pending, {}
+        self.flushed = len(widgets)
+        for widget in widgets:
+            style = widget.style()
+            style.unpolish(widget)
+            style.polish(widget)
+            widget.update()
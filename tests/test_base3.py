@@ -0,0 +1,53 @@
+# base 3 indexes: index / fromIndex / digit round trip, and play / undo keeping up with moves
+import random
+import unittest
+
+from engine import base3
+from engine.bitboard import FULL
+
+
+class Base3Test(unittest.TestCase):
+    def testRoundTrip(self):
+        seen = set()
+        for x in range(FULL + 1):
+            rest = FULL & ~x
+            o = rest
+            while True:  # every o among the cells x left free
+                i = base3.index(x, o)
+                self.assertEqual(base3.fromIndex(i), (x, o))
+                for cell in range(9):
+                    self.assertEqual(base3.digit(i, cell), 1 if x >> cell & 1 else 2 if o >> cell & 1 else 0)
+                seen.add(i)
+                if not o:
+                    break
+                o = (o - 1) & rest
+        self.assertEqual(seen, set(range(base3.SLOTS)))  # every slot is exactly one position
+
+    def testPlayUndo(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            cells = rng.sample(range(9), rng.randint(1, 9))
+            x = o = i = 0
+            played = []
+            for n, cell in enumerate(cells):
+                mark = 'XO'[n % 2]
+                i = base3.play(i, cell, mark)
+                if mark == 'X':
+                    x |= 1 << cell
+                else:
+                    o |= 1 << cell
+                played.append((i, cell, mark))
+                self.assertEqual(i, base3.index(x, o))
+            for before, cell, mark in reversed(played):
+                self.assertEqual(i, before)
+                i = base3.undo(i, cell, mark)
+            self.assertEqual(i, 0)
+
+    def testTables(self):
+        self.assertEqual(len(base3.table()), base3.SLOTS)
+        self.assertEqual(set(base3.table('b', -1)), {-1})
+        self.assertEqual(len(base3.byteTable(5)), base3.SLOTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
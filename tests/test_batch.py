@@ -0,0 +1,85 @@
+# batch.classify against Board.result() and the winning line, one board at a time
+import random
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, like in engine/batch.py
+    np = None
+
+from engine import Bitboard, Board, batch
+
+RESULTS = {'': batch.ONGOING, 'X': batch.X_WINS, 'O': batch.O_WINS, 'Tie': batch.TIE}
+
+
+def randomBoards(size, k, count, rng):
+    # positions of random games, stopped anywhere: (int8 rows, the Boards)
+    rows, boards = [], []
+    for _ in range(count):
+        board = Board(size, k)
+        mark = 'X'
+        for _ in range(rng.randint(0, size * size)):
+            if board.result():
+                break
+            board.make(rng.choice(board.emptyCells()), mark)
+            mark = 'O' if mark == 'X' else 'X'
+        rows.append([{'X': batch.X, 'O': batch.O, ' ': batch.EMPTY}[m] for m in board.toList()])
+        boards.append(board)
+    return np.array(rows, dtype=np.int8), boards
+
+
+@unittest.skipIf(np is None, "engine.batch needs numpy")
+class ClassifyTest(unittest.TestCase):
+    def check(self, size, k, rows, boards):
+        result, line = batch.classify(rows, k)
+        lines = batch.lineTable(size, k)  # 3 x 3 lines are numbered like Bitboard's, not Board's
+        for i, board in enumerate(boards):
+            with self.subTest(size=size, k=k, board=board):
+                self.assertEqual(result[i], RESULTS[board.result()])
+                if board.winner:
+                    self.assertTrue(all(board[int(cell)] == board.winner for cell in lines[line[i]]))
+                else:
+                    self.assertEqual(line[i], -1)
+
+    def testMatchesBoard(self):
+        rng = random.Random(11)
+        for size, k in ((3, 3), (4, 3), (5, 4), (7, 5), (15, 5)):
+            rows, boards = randomBoards(size, k, 300, rng)
+            self.check(size, k, rows, boards)
+
+    def testSmallChunks(self):
+        # passes split the boards, the answers mustn't depend on where
+        rng = random.Random(5)
+        elements = batch.ELEMENTS
+        try:
+            batch.ELEMENTS = 40
+            for size, k in ((3, 3), (5, 4)):
+                rows, boards = randomBoards(size, k, 50, rng)
+                self.check(size, k, rows, boards)
+        finally:
+            batch.ELEMENTS = elements
+
+    def testEveryBitboard(self):
+        # all 3 x 3 layouts with as many X as O or one more, through fromBits
+        x, o = [], []
+        for xs in range(512):
+            for os in range(512):
+                if not xs & os and 0 <= bin(xs).count('1') - bin(os).count('1') <= 1:
+                    x.append(xs)
+                    o.append(os)
+        result, _ = batch.classify(batch.fromBits(x, o))
+        expected = [RESULTS[Bitboard(xs, os).result()] for xs, os in zip(x, o)]
+        self.assertEqual(result.tolist(), expected)
+
+    def testLegalMoves(self):
+        rows = np.array([[0] * 9, [1, 1, 1, 2, 2, 0, 0, 0, 0], [1, 2, 0, 0, 0, 0, 0, 0, 0]], dtype=np.int8)
+        moves = batch.legalMoves(rows)
+        self.assertEqual(moves.sum(axis=1).tolist(), [9, 0, 7])
+
+    def testBadShape(self):
+        with self.assertRaises(ValueError):
+            batch.classify(np.zeros((2, 10), dtype=np.int8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# Board's per line counters against counting the marks from scratch, through make and unmake
+import random
+import unittest
+
+from engine import Board
+from engine.board import WEIGHTS
+
+
+def recount(board):  # (X counts, O counts, score, winners) worked out from the marks alone
+    xCount, oCount, score, winners = [], [], 0, set()
+    for line in board.geometry.lines:
+        xs = sum(board[cell] == 'X' for cell in line)
+        os = sum(board[cell] == 'O' for cell in line)
+        xCount.append(xs)
+        oCount.append(os)
+        if not os:
+            score += WEIGHTS[xs]
+        if not xs:
+            score -= WEIGHTS[os]
+        if xs == board.k:
+            winners.add('X')
+        if os == board.k:
+            winners.add('O')
+    return xCount, oCount, score, winners
+
+
+def snapshot(board):
+    return (board.x, board.o, board.line, board.winner, board.xCount[:], board.oCount[:],
+            board.emptyCount, board.score, dict(board.near), board.history[:])
+
+
+class BoardTest(unittest.TestCase):
+    def check(self, board):
+        xCount, oCount, score, winners = recount(board)
+        self.assertEqual(board.xCount, xCount)
+        self.assertEqual(board.oCount, oCount)
+        self.assertEqual(board.score, score)
+        self.assertEqual(board.emptyCount, len(board.emptyCells()))
+        if board.winner:
+            self.assertIn(board.winner, winners)
+            self.assertTrue(all(board[cell] == board.winner for cell in board.lineCells(board.line)))
+        else:
+            self.assertEqual(winners, set())
+
+    def testMakeUnmake(self):
+        rng = random.Random(7)
+        for size, k in ((3, 3), (4, 3), (5, 4), (7, 5), (15, 5)):
+            for game in range(20 if size < 15 else 3):
+                board = Board(size, k)
+                before = [snapshot(board)]
+                mark = 'X'
+                with self.subTest(size=size, k=k, game=game):
+                    while not board.result():
+                        board.make(rng.choice(board.emptyCells()), mark)
+                        self.check(board)
+                        before.append(snapshot(board))
+                        mark = 'O' if mark == 'X' else 'X'
+                    before.pop()
+                    while board.history:
+                        board.unmake()
+                        self.assertEqual(snapshot(board), before.pop())  # every counter back as it was
+
+    def testRemoveOutOfOrder(self):
+        board = Board(5, 4)
+        for cell, mark in ((0, 'X'), (6, 'O'), (1, 'X'), (7, 'O'), (2, 'X'), (8, 'O'), (3, 'X')):
+            board.make(cell, mark)
+        self.assertEqual(board.result(), 'X')
+        board.remove(1)  # not the last move, the window does this through GameState.undo
+        self.assertEqual(board.result(), '')
+        self.assertEqual(board.history, [0, 6, 7, 2, 8, 3])
+        self.check(board)
+        board.remove(1)  # already empty, nothing happens
+        self.assertEqual(board.history, [0, 6, 7, 2, 8, 3])
+
+    def testNearCells(self):
+        board = Board(5, 4)
+        board.make(0, 'X')
+        self.assertEqual(sorted(board.nearCells()), [1, 5, 6])
+        board.make(6, 'O')
+        self.assertEqual(sorted(board.nearCells()), [1, 2, 5, 7, 10, 11, 12])
+        board.unmake()
+        self.assertEqual(sorted(board.nearCells()), [1, 5, 6])
+
+    def testCopyIsIndependent(self):
+        board = Board(5, 4)
+        board.make(12, 'X')
+        copy = board.copy()
+        copy.make(13, 'O')
+        self.assertEqual(board.history, [12])
+        self.assertEqual(board[13], ' ')
+        self.check(board)
+        self.check(copy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# engineservice.py over a real connection: batching, repeats in a batch, the cache and stats
+import asyncio
+import json
+import unittest
+
+from engineservice import MAX_LINE, Service
+
+
+class ServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = Service()
+        self.service.ready = asyncio.Event()  # serve() does this, and the rest below
+        self.batcher = asyncio.ensure_future(self.service.batcher())
+        self.listener = await asyncio.start_server(self.service.handle, '127.0.0.1', 0, limit=MAX_LINE)
+        port = self.listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', port)
+
+    async def asyncTearDown(self):
+        self.writer.write_eof()
+        await self.reader.read()  # the service closes its side once it has answered everything
+        self.writer.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.batcher.cancel()
+        self.service.pool.shutdown()
+
+    async def ask(self, *requests):  # sends every line in one go, then reads as many replies
+        self.writer.write(''.join(request + '\n' for request in requests).encode())
+        await self.writer.drain()
+        return [(await asyncio.wait_for(self.reader.readline(), 10)).decode().rstrip('\n') for _ in requests]
+
+    async def stats(self):
+        return json.loads((await self.ask('stats'))[0])
+
+    async def testAnswers(self):
+        replies = await self.ask('XX..O.... hard O', 'OO..X.X.. hard X', '.........')
+        self.assertEqual(replies[:2], ['3', '3'])  # both block (or win) on the top row
+        self.assertIn(int(replies[2]), range(1, 10))
+
+    async def testBatchAndRepeats(self):
+        positions = ['X........', '.X.......', '..X......', '...X.....']
+        requests = [f"{position} hard O" for position in positions] * 5  # 4 distinct, 20 in all
+        replies = await self.ask(*requests)
+        self.assertEqual(replies[:4] * 5, replies)  # in order, and a repeat gets the same answer
+        stats = await self.stats()
+        self.assertEqual(stats['requests'], 20)
+        self.assertLess(stats['batches'], 20)  # pipelined requests are answered together
+        self.assertEqual(stats['solved'] + stats['cached'], 4)  # each distinct request worked out once
+        self.assertEqual(stats['repeats'], 16)
+
+        self.assertEqual(await self.ask(*requests[:4]), replies[:4])
+        stats = await self.stats()
+        self.assertEqual(stats['cached'], 4)  # the second time they all come from the cache
+        self.assertEqual(stats['solved'], 4)
+
+    async def testRandomLevelIsNotShared(self):
+        await self.ask(*['......... medium O'] * 10)
+        await self.ask('......... medium O')
+        stats = await self.stats()
+        self.assertEqual((stats['solved'], stats['cached'], stats['repeats']), (11, 0, 0))
+        self.assertEqual(len(self.service.cache), 0)
+
+    async def testErrors(self):
+        replies = await self.ask('X........ hard X', 'XX....... hard O 7', 'X........ hard O')
+        self.assertTrue(replies[0].startswith('error: '))
+        self.assertTrue(replies[1].startswith('error: '))
+        self.assertIn(int(replies[2]), range(1, 10))  # the batch goes on after a bad request
+        self.assertEqual(list(self.service.cache), ['X........ hard O'])  # errors aren't kept
+
+    async def testBrokenBatch(self):
+        answerBatch = self.service.answerBatch
+
+        async def broken(batch):
+            raise RuntimeError("broken")
+        self.service.answerBatch = broken
+        self.assertEqual(await self.ask('X........ hard O'), ['error: RuntimeError: broken'])
+        self.service.answerBatch = answerBatch  # the batcher survived it
+        self.assertIn(int((await self.ask('X........ hard O'))[0]), range(1, 10))
+
+    async def testTooLong(self):
+        self.assertEqual(await self.ask('.' * MAX_LINE * 2), ['error: request too long'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# the game window's undo, redo and game log, driven through its buttons without a display
+import os
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import QtWidgets  # noqa: E402
+
+import game  # noqa: E402
+from engine.record import GameLog, readGames, replay  # noqa: E402
+
+
+class GameWindowTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        cls.window = QtWidgets.QMainWindow()
+
+    def setUp(self):
+        self.ui = game.Ui_MainWindow()
+        self.ui.computerPlayer.delay = 0
+        self.ui.startup(self.window)
+
+    def wait(self, timeout=5):  # runs the event loop until the computer has moved
+        self.app.processEvents()
+        end = time.monotonic() + timeout
+        while self.ui.thinking and time.monotonic() < end:
+            self.app.processEvents()
+            time.sleep(0.001)
+        self.assertFalse(self.ui.thinking, "the computer didn't move")
+
+    def click(self, cell):
+        self.ui.buttons[cell].click()
+        self.wait()
+
+    def free(self):
+        return [cell for cell, mark in enumerate(self.ui.board) if mark == ' ']
+
+    def computerGame(self, computerStarts=False):
+        self.ui.setupUi(self.window, False, 'hard')
+        self.wait()
+        if computerStarts:  # starters take turns, the second game is the computer's
+            self.click(self.free()[0])
+            self.ui.gameReset()
+            self.wait()
+            self.assertEqual(self.ui.state.starter(), 'O')
+
+    def testUndoRedoAgainstComputer(self):
+        self.computerGame()
+        self.click(4)
+        self.click(self.free()[0])
+        moves = list(self.ui.state.moves)
+        self.assertEqual(len(moves), 4)
+
+        self.ui.undoB.click()  # the player's move and the computer's answer to it
+        self.assertEqual(self.ui.state.moves, moves[:2])
+        self.assertEqual(self.ui.buttons[moves[2]].text(), '')
+        self.assertTrue(self.ui.buttons[moves[2]].isEnabled())
+        self.ui.undoB.click()
+        self.ui.undoB.click()  # nothing left, X started
+        self.assertEqual(self.ui.state.moves, [])
+        self.assertEqual(self.ui.state.undone, moves[::-1])
+
+        self.ui.redoB.click()
+        self.assertEqual(self.ui.state.moves, moves[:2])
+        self.ui.redoB.click()
+        self.assertEqual(self.ui.state.moves, moves)
+        self.assertEqual([self.ui.buttons[cell].text() for cell in moves], ['X', 'O', 'X', 'O'])
+        self.assertFalse(self.ui.thinking)
+
+    def testNewMoveClearsRedo(self):
+        self.computerGame()
+        self.click(4)
+        self.ui.undoB.click()
+        self.assertTrue(self.ui.state.undone)
+        self.click(0)
+        self.assertEqual(self.ui.state.undone, [])
+        self.assertEqual(self.ui.state.moves[0], 0)
+        self.ui.redoB.click()  # nothing to redo
+        self.assertEqual(len(self.ui.state.moves), 2)
+
+    def testComputerOpeningStays(self):
+        self.computerGame(computerStarts=True)
+        opening = self.ui.state.moves[0]
+        self.click(self.free()[0])
+        self.ui.undoB.click()
+        self.ui.undoB.click()
+        self.assertEqual(self.ui.state.moves, [opening])
+        self.assertEqual(self.ui.state.turn(), 'X')
+        self.assertEqual(self.ui.state.starter(), 'O')
+
+    def testUndoWhileComputerOpens(self):
+        self.computerGame()
+        self.click(self.free()[0])
+        self.ui.gameReset()
+        self.assertTrue(self.ui.thinking)  # the computer's opening move is on its way
+        self.ui.undoB.click()  # nothing to undo, the opening move still comes
+        self.wait()
+        self.assertEqual(len(self.ui.state.moves), 1)
+        self.click(self.free()[0])
+        self.assertEqual(self.ui.state.starter(), 'O')
+        self.assertEqual([self.ui.state.bits[cell] for cell in self.ui.state.moves[:2]], ['O', 'X'])
+
+    def testUndoFinishedGame(self):
+        self.ui.setupUi(self.window, True)
+        for cell in (0, 3, 1, 4, 2):
+            self.ui.buttons[cell].click()
+        self.assertEqual(self.ui.playerX, 1)
+        self.ui.undoB.click()  # the win is taken back with the move
+        self.assertEqual(self.ui.playerX, 0)
+        self.assertEqual(self.ui.winner.text(), '')
+        self.assertTrue(self.ui.buttons[8].isEnabled())
+        self.ui.redoB.click()
+        self.assertEqual(self.ui.playerX, 1)
+        self.assertEqual(self.ui.winner.text(), 'X won!')
+        self.assertFalse(any(button.isEnabled() for button in self.ui.buttons))
+
+    def testFinishedGamesAreLogged(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        path = os.path.join(folder.name, 'games.log')
+        self.ui.gameLog = GameLog(path)
+        self.ui.setupUi(self.window, True)
+        for cell in (0, 3, 1, 4, 2):
+            self.ui.buttons[cell].click()
+        self.ui.gameReset()
+        self.ui.buttons[8].click()  # O starts the second game, which isn't finished
+        self.ui.closeLog()
+        games = list(readGames(path))
+        self.assertEqual(games, [([0, 3, 1, 4, 2], 'X')])
+        self.assertEqual(replay(*games[0])[1], 'X')
+
+
+if __name__ == "__main__":
+    unittest.main()
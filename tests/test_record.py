@@ -0,0 +1,107 @@
+# game records: encode / decode, readGames over chunks and a cut off tail, and GameLog
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+
+import gamelog
+from engine import record
+
+
+def randomGame(rng):  # (cells, starter) of a random game, finished or not
+    return rng.sample(range(9), rng.randint(0, 9)), rng.choice('XO')
+
+
+class RecordTest(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, 'games.log')
+
+    def testEncodeDecode(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            moves, starter = randomGame(rng)
+            data = record.encode(moves, starter)
+            self.assertEqual(len(data), record.size(data[0]))
+            self.assertEqual(len(data), 1 + (len(moves) + 1) // 2)
+            self.assertEqual(record.decode(data), (moves, starter))
+        self.assertEqual(len(record.encode(list(range(9)))), 6)
+
+    def testBadGames(self):
+        with self.assertRaises(ValueError):
+            record.encode(list(range(9)) + [0])
+        with self.assertRaises(ValueError):
+            record.encode([4, 9])
+
+    def testReadGames(self):
+        rng = random.Random(2)
+        games = [randomGame(rng) for _ in range(1000)]
+        with open(self.path, 'wb') as f:
+            f.write(b''.join(record.encode(*game) for game in games))
+        self.assertEqual(list(record.readGames(self.path)), games)
+
+        chunk = record.CHUNK
+        try:
+            record.CHUNK = 7  # records cut across chunk boundaries
+            self.assertEqual(list(record.readGames(self.path)), games)
+        finally:
+            record.CHUNK = chunk
+
+    def testTruncatedTail(self):
+        last = record.encode([0, 4, 8, 2, 6], 'O')
+        with open(self.path, 'wb') as f:
+            f.write(record.encode([4, 0]) + last[:-1])  # the writer was killed mid record
+        self.assertEqual(list(record.readGames(self.path)), [([4, 0], 'X')])
+
+    def testNotALog(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\x0f' + bytes(8))
+        with self.assertRaises(ValueError):
+            list(record.readGames(self.path))
+
+    def testReplay(self):
+        bits, result = record.replay([0, 3, 1, 4, 2])
+        self.assertEqual(result, 'X')
+        self.assertEqual(bits.toList()[:5], ['X', 'X', 'X', 'O', 'O'])
+        self.assertEqual(record.replay([4, 0, 8], 'O')[0].toList()[4], 'O')
+        self.assertEqual(record.replay([])[1], '')
+
+    def testGameLog(self):
+        log = record.GameLog(self.path)
+        log.append([4, 0, 8], 'O')
+        log.appendRecords(record.encode([0, 3, 1, 4, 2]) + record.encode([]))
+        log.close()
+        log.close()  # a second close does nothing
+        self.assertIsNone(log.error)
+        self.assertEqual(list(record.readGames(self.path)), [([4, 0, 8], 'O'), ([0, 3, 1, 4, 2], 'X'), ([], 'X')])
+
+        log = record.GameLog(self.path)  # appends to what is there
+        log.append([2])
+        log.close()
+        self.assertEqual(len(list(record.readGames(self.path))), 4)
+
+    def testGameLogError(self):
+        log = record.GameLog(os.path.join(self.path, 'nowhere', 'games.log'))
+        log.thread.join()
+        self.assertIsInstance(log.error, OSError)
+        log.append([4])  # dropped, nothing would write it
+        self.assertTrue(log.pending.empty())
+        log.close()
+
+    def testSummary(self):  # gamelog.py over a log with a cut off record at the end
+        with open(self.path, 'wb') as f:
+            f.write(record.encode([0, 3, 1, 4, 2]) + record.encode([4, 0, 8], 'O') + record.encode([0, 1])[:1])
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            gamelog.summary(self.path)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("2 games read"))
+        self.assertIn("X started         1: X 100.0%", lines[1])
+        self.assertIn("unfinished 100.0%", lines[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# Search.bestMove against a plain exhaustive minimax, on every position a game can reach
+import functools
+import unittest
+
+from engine import Bitboard, Search, Tablebase
+from engine.bitboard import CELLS, FULL, WIN_LINE
+from engine.tablebase import DRAW, LOSS, WIN
+
+
+@functools.lru_cache(maxsize=None)
+def minimax(me, opp, depth):  # score for the side to move, opp just moved
+    if WIN_LINE[opp] >= 0:
+        return -1
+    empty = FULL & ~(me | opp)
+    if not empty or depth <= 0:
+        return 0
+    return max(-minimax(opp, me | (1 << cell), depth - 1) for cell in CELLS[empty])
+
+
+def minimaxMove(me, opp, depth):  # lowest cell among the best scoring ones
+    scores = {cell: -minimax(opp, me | (1 << cell), depth - 1) for cell in CELLS[FULL & ~(me | opp)]}
+    best = max(scores.values())
+    return min(cell for cell, score in scores.items() if score == best), best
+
+
+def positions():
+    # (x, o, mark to move) of every unfinished position, whoever started
+    seen = set()
+
+    def visit(x, o, mark):
+        if (x, o, mark) in seen or WIN_LINE[x] >= 0 or WIN_LINE[o] >= 0 or (x | o) == FULL:
+            return
+        seen.add((x, o, mark))
+        for cell in CELLS[FULL & ~(x | o)]:
+            if mark == 'X':
+                visit(x | (1 << cell), o, 'O')
+            else:
+                visit(x, o | (1 << cell), 'X')
+
+    visit(0, 0, 'X')
+    visit(0, 0, 'O')
+    return sorted(seen)
+
+
+class BestMoveTest(unittest.TestCase):
+    def testMatchesMinimax(self):
+        everything = positions()
+        for depth in (1, 4, 9):
+            search = Search()  # one search per depth, its table shared by all positions like in a game
+            for x, o, mark in everything:
+                me, opp = (x, o) if mark == 'X' else (o, x)
+                with self.subTest(x=x, o=o, mark=mark, depth=depth):
+                    cell, score = minimaxMove(me, opp, depth)
+                    self.assertEqual(search.bestMove(Bitboard(x, o), mark, depth), cell)
+                    self.assertEqual(search.score, score)
+
+    def testThinkFinishesWithBestMove(self):
+        search = Search()
+        for x, o, mark in positions()[::97]:
+            me, opp = (x, o) if mark == 'X' else (o, x)
+            with self.subTest(x=x, o=o, mark=mark):
+                self.assertEqual(search.think(Bitboard(x, o), mark, budget=10), minimaxMove(me, opp, 9)[0])
+
+
+class TablebaseTest(unittest.TestCase):
+    def testMatchesMinimax(self):
+        table = Tablebase.load()
+        results = {-1: LOSS, 0: DRAW, 1: WIN}
+        for x, o, mark in positions():
+            me, opp = (x, o) if mark == 'X' else (o, x)
+            with self.subTest(x=x, o=o, mark=mark):
+                self.assertEqual(table.result(me, opp), results[minimax(me, opp, 9)])
+                best = minimaxMove(me, opp, 9)[1]
+                for cell in table.bestMoves(me, opp):
+                    self.assertEqual(-minimax(opp, me | (1 << cell), 8), best)
+
+
+if __name__ == "__main__":
+    unittest.main()
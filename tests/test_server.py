@@ -0,0 +1,106 @@
+# server.py's line protocol, with real connections to a server on a free port
+import asyncio
+import json
+import unittest
+
+from server import MAX_LINE, Server
+
+
+class ServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = Server()
+        self.listener = await asyncio.start_server(self.server.handle, '127.0.0.1', 0, limit=MAX_LINE)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.writers = []
+
+    async def asyncTearDown(self):
+        for writer in self.writers:
+            writer.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        self.writers.append(writer)
+        return reader, writer
+
+    async def send(self, writer, message):
+        writer.write((message if isinstance(message, str) else json.dumps(message)).encode() + b'\n')
+        await writer.drain()
+
+    async def receive(self, reader):
+        return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+    async def match(self, **options):  # two players joined: (x reader, x writer), (o reader, o writer)
+        x = await self.connect()
+        o = await self.connect()
+        await self.send(x[1], dict(op='join', **options))
+        await asyncio.sleep(0.01)  # x waits first, so x plays X
+        await self.send(o[1], dict(op='join', **options))
+        for (reader, _), mark in ((x, 'X'), (o, 'O')):
+            start = await self.receive(reader)
+            self.assertEqual((start['op'], start['mark'], start['turn']), ('start', mark, 'X'))
+        return x, o
+
+    async def testGameToTheEnd(self):
+        (xr, xw), (orr, ow) = await self.match()
+        for reader, writer, cell in ((xr, xw, 0), (orr, ow, 3), (xr, xw, 1), (orr, ow, 4)):
+            await self.send(writer, {'op': 'move', 'cell': cell})
+            for r in (xr, orr):
+                moved = await self.receive(r)
+                self.assertEqual(moved['cell'], cell)
+                self.assertEqual(moved['turn'], 'O' if writer is xw else 'X')
+        await self.send(xw, {'op': 'move', 'cell': 2})
+        for r in (xr, orr):
+            self.assertEqual(await self.receive(r), {'op': 'moved', 'mark': 'X', 'cell': 2})
+            self.assertEqual(await self.receive(r), {'op': 'over', 'result': 'X', 'line': [0, 1, 2]})
+        self.assertEqual((self.server.matches, self.server.finished), (0, 1))
+
+        await self.send(xw, {'op': 'move', 'cell': 5})  # the match is over
+        self.assertEqual(await self.receive(xr), {'op': 'error', 'error': "not in a match"})
+
+    async def testErrors(self):
+        (xr, xw), (orr, ow) = await self.match()
+        await self.send(ow, {'op': 'move', 'cell': 4})
+        self.assertEqual(await self.receive(orr), {'op': 'error', 'error': "not your turn"})
+        for cell in (9, -1, 'a', None):
+            await self.send(xw, {'op': 'move', 'cell': cell})
+            self.assertEqual(await self.receive(xr), {'op': 'error', 'error': "that cell isn't free"})
+        await self.send(xw, {'op': 'move', 'cell': 4})
+        await self.receive(xr)
+        await self.receive(orr)
+        await self.send(ow, {'op': 'move', 'cell': 4})
+        self.assertEqual(await self.receive(orr), {'op': 'error', 'error': "that cell isn't free"})
+
+        await self.send(xw, {'op': 'join'})
+        self.assertEqual(await self.receive(xr), {'op': 'error', 'error': "already in a match"})
+        await self.send(xw, {'op': 'resign'})
+        self.assertEqual(await self.receive(xr), {'op': 'error', 'error': "unknown op 'resign'"})
+        await self.send(xw, 'not json')
+        self.assertEqual(await self.receive(xr), {'op': 'error', 'error': "not a message"})
+        await self.send(xw, {'op': 'join', 'size': 20})
+        self.assertEqual((await self.receive(xr))['op'], 'error')
+
+    async def testBiggerBoard(self):
+        (xr, xw), (orr, ow) = await self.match(size=5, k=4)
+        await self.send(xw, {'op': 'move', 'cell': 24})
+        self.assertEqual(await self.receive(orr), {'op': 'moved', 'mark': 'X', 'cell': 24, 'turn': 'O'})
+
+    async def testLeaverLoses(self):
+        (xr, xw), (orr, ow) = await self.match()
+        ow.close()
+        self.assertEqual(await self.receive(xr), {'op': 'over', 'result': 'X', 'left': True})
+        self.assertEqual(self.server.matches, 0)
+        await self.send(xw, {'op': 'join'})  # free to play again
+        await asyncio.sleep(0.01)
+        self.assertIs(self.server.waiting[3, 3].mark, None)
+
+    async def testTooLong(self):
+        reader, writer = await self.connect()
+        await self.send(writer, 'x' * (MAX_LINE * 2))
+        self.assertEqual(await self.receive(reader), {'op': 'error', 'error': "message too long"})
+        self.assertEqual(await asyncio.wait_for(reader.readline(), 5), b'')  # and the connection is closed
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# GameState: turns, the move list and undo/redo, on the bitboard and on a bigger Board
+import unittest
+
+from engine import GameState
+
+
+class GameStateTest(unittest.TestCase):
+    def testTurnsAndStarter(self):
+        state = GameState()
+        state.swapStarter()  # the window does this before the first move of every game
+        self.assertEqual(state.starter(), 'X')
+        self.assertEqual(state.turn(), 'X')
+        state.play(4, 'X')
+        self.assertEqual(state.turn(), 'O')
+        self.assertEqual(state.starter(), 'X')  # whoever moved first, whatever the turn
+
+        state.newGame()
+        state.swapStarter()
+        self.assertEqual(state.starter(), 'O')
+        self.assertEqual(state.turn(), 'O')
+
+    def testUndoRedo(self):
+        state = GameState()
+        state.swapStarter()
+        for cell in (4, 0, 8):
+            state.play(cell, state.turn())
+        self.assertEqual(state.undo(), 8)
+        self.assertEqual(state.undo(), 0)
+        self.assertEqual(state.moves, [4])
+        self.assertEqual(state.undone, [8, 0])
+        self.assertEqual(state.board, [' '] * 4 + ['X'] + [' '] * 4)
+        self.assertEqual(state.turn(), 'O')
+
+        self.assertEqual(state.redo(), 0)
+        self.assertEqual(state.board[0], 'O')  # each move comes back with the mark that played it
+        self.assertEqual(state.redo(), 8)
+        self.assertEqual(state.board[8], 'X')
+        self.assertEqual(state.moves, [4, 0, 8])
+        self.assertEqual(state.undone, [])
+        self.assertEqual(state.playerFlag, 3)
+
+    def testNewMoveClearsRedo(self):
+        state = GameState()
+        state.swapStarter()
+        state.play(4, 'X')
+        state.play(0, 'O')
+        state.undo()
+        self.assertEqual(state.undone, [0])
+        state.play(2, 'O')
+        self.assertEqual(state.undone, [])
+        self.assertEqual(state.moves, [4, 2])
+
+        state.undo()
+        state.newGame()  # nothing carries over to the next game either
+        self.assertEqual((state.moves, state.undone, state.playerFlag), ([], [], 0))
+
+    def testGameOver(self):
+        state = GameState()
+        state.swapStarter()
+        for cell in (0, 3, 1, 4, 2):
+            state.play(cell, state.turn())
+        self.assertEqual(state.checkGameOver(), 'X')
+        self.assertEqual(state.winningLine, (1, 2, 3))
+        state.undo()  # not won anymore
+        self.assertEqual(state.checkGameOver(), '')
+        self.assertIsNone(state.winningLine)
+        state.redo()
+        self.assertEqual(state.checkGameOver(), 'X')
+
+        state.newGame()
+        for cell in (0, 1, 2, 4, 3, 5, 7, 6, 8):  # X O X / X O O / O X X
+            state.play(cell, state.turn())
+        self.assertEqual(state.checkGameOver(), 'Tie')
+
+    def testBigBoard(self):
+        state = GameState(5, 4)
+        state.swapStarter()
+        for cell in (0, 5, 1, 6, 2, 7):
+            state.play(cell, state.turn())
+        self.assertEqual(state.checkGameOver(), '')
+        state.play(3, 'X')
+        self.assertEqual(state.checkGameOver(), 'X')
+        self.assertEqual(state.winningLine, (1, 2, 3, 4))
+        state.undo()
+        self.assertEqual(state.checkGameOver(), '')
+        self.assertEqual(state.undone, [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,8 @@
+# shared by the benchmark, the load tests and the engine service's latency stats
+
+
+def percentile(values, p):  # nearest rank, 0.0 for no values
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
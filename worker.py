@@ -0,0 +1,69 @@
+# runs the computer's move on a worker thread so the window keeps drawing while it thinks
+from PyQt5 import QtCore
+
+from engine import trace
+
+
+class MoveSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(int, object)  # (request id, cell or whatever think() returned)
+
+
+class MoveWorker(QtCore.QRunnable):
+    def __init__(self, requestId, think):
+        super().__init__()
+        self.requestId = requestId
+        self.think = think
+        self.signals = MoveSignals()
+
+    def run(self):
+        cell = self.think()
+        self.signals.finished.emit(self.requestId, cell)
+
+
+class ComputerPlayer(QtCore.QObject):
+    moveReady = QtCore.pyqtSignal(int)  # cell the computer picked, emitted on the GUI thread
+
+    def __init__(self, delay=700, parent=None):
+        super().__init__(parent)
+        self.delay = delay  # msecs to wait before thinking, so the move doesn't feel instant
+        self.requestId = 0
+        # one thread: searches share their caches, and an old search is never racing a new one
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def request(self, think, delay=None):
+        # think() runs on the worker thread and must only use data it was given
+        self.cancel()
+        requestId = self.requestId
+        if delay is None:
+            delay = self.delay
+        requested = trace.now() if trace.enabled else 0
+        QtCore.QTimer.singleShot(delay, lambda: self.start(requestId, think, requested))
+
+    def cancel(self):  # drop whatever is waiting or thinking right now
+        self.requestId += 1
+
+    def start(self, requestId, think, requested=0):
+        if trace.enabled:  # the wait before thinking, from request() until now
+            trace.complete(type(self).__name__ + '.delay', 'wait', requested, {'cancelled': requestId != self.requestId})
+        if requestId != self.requestId:  # cancelled while waiting
+            return
+        worker = MoveWorker(requestId, think)
+        worker.signals.finished.connect(self.finished)
+        self.pool.start(worker)
+
+    def finished(self, requestId, cell):
+        if requestId == self.requestId:  # ignore answers for a game that was reset
+            self.moveReady.emit(cell)
+
+
+class Analyst(ComputerPlayer):
+    # the analysis overlay's thread, next to the computer's so neither waits for the other
+    valuesReady = QtCore.pyqtSignal(object)  # what think() returned, on the GUI thread
+
+    def __init__(self, parent=None):
+        super().__init__(0, parent)
+
+    def finished(self, requestId, values):
+        if requestId == self.requestId:  # the board changed since, a newer request is coming
+            self.valuesReady.emit(values)